@@ -0,0 +1,45 @@
+"""
+作者解析器 - 带缓存与预计算索引的姓名映射
+"""
+
+
+class AuthorResolver:
+    """将 Git 作者名/邮箱解析为真实姓名
+
+    每个 (作者名, 邮箱) 组合只解析一次；小写键在构造时预计算，
+    未命中映射的作者（机器人、外部贡献者）不会在每次提交时重复扫描映射表。
+    """
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        # 保持映射表原有顺序，部分匹配时优先级与之前一致
+        self._lower_keys = [(key.lower(), value) for key, value in self.mapping.items()]
+        self._cache = {}
+
+    def resolve(self, name, email=''):
+        """返回规范化后的作者名（带缓存）"""
+        key = (name, email)
+        author = self._cache.get(key)
+        if author is None:
+            author = self._cache[key] = self._lookup(name, email)
+        return author
+
+    def _lookup(self, name, email):
+        # 尝试精确匹配
+        if name in self.mapping:
+            return self.mapping[name]
+
+        # 尝试部分匹配（不区分大小写）
+        name_lower = name.lower()
+        if name_lower:
+            for key_lower, value in self._lower_keys:
+                if key_lower in name_lower or name_lower in key_lower:
+                    return value
+
+        # 尝试邮箱用户名精确匹配（如 2301_79648705@gitee.com）
+        local_part = email.split('@', 1)[0]
+        if local_part in self.mapping:
+            return self.mapping[local_part]
+
+        # 如果没有匹配，返回原名
+        return name
@@ -0,0 +1,116 @@
+"""
+发布产物 - 精简、预压缩与体积预算
+
+- minify: 去掉每行的缩进与空行（页面中没有 <pre>/<textarea>，脚本依赖的换行保持不变）
+- 预压缩: 为 HTML/JSON/CSS/JS 产物生成 .gz 与 .br 同名文件，供静态托管直接返回
+- build-manifest.json: 记录各产物的原始与压缩后大小
+- 体积预算: 任一 HTML 页面（未压缩）超出预算时构建失败
+"""
+
+import os
+import gzip
+
+from stats_cache import save_json, atomic_write, ensure_file_mode
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只生成 .gz
+    brotli = None
+
+MANIFEST_NAME = 'build-manifest.json'
+ARTIFACT_EXTENSIONS = ('.html', '.json', '.css', '.js')
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def minify_chunks(chunks):
+    """逐段去掉行首空白与空行（流式处理，跨块的行会先缓冲）"""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        out = [line.lstrip() for line in lines]
+        out = [line for line in out if line]
+        if out:
+            yield '\n'.join(out) + '\n'
+    pending = pending.lstrip()
+    if pending:
+        yield pending
+
+
+def minify_html(text):
+    return ''.join(minify_chunks([text]))
+
+
+def list_artifacts(output_dir):
+    """列出目录下的 HTML/JSON 产物（相对路径，不含构建清单本身）"""
+    artifacts = []
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            if name.endswith(ARTIFACT_EXTENSIONS) and name != MANIFEST_NAME:
+                artifacts.append(os.path.relpath(os.path.join(root, name), output_dir).replace(os.sep, '/'))
+    return sorted(artifacts)
+
+
+def _compressed(path, suffix, compress):
+    """生成（或复用未过期的）压缩文件，返回其大小"""
+    target = path + suffix
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+        with open(path, 'rb') as f:
+            atomic_write(target, compress(f.read()))
+    else:
+        ensure_file_mode(target)
+    return os.path.getsize(target)
+
+
+def compress_file(path):
+    """为单个文件生成 .gz（及 .br）同名文件，返回压缩后大小"""
+    # mtime=0 使相同内容的压缩结果逐字节一致
+    sizes = {'gzip': _compressed(path, '.gz', lambda data: gzip.compress(data, 9, mtime=0))}
+    if brotli is not None:
+        sizes['brotli'] = _compressed(path, '.br', lambda data: brotli.compress(data, quality=11))
+    return sizes
+
+
+def _remove_compressed(path):
+    # 关闭压缩后删除旧的压缩文件，避免托管端返回过期内容
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def remove_build_outputs(output_dir, artifacts):
+    """未启用压缩与预算时，清除以前生成的压缩文件与构建清单"""
+    for name in artifacts:
+        _remove_compressed(os.path.join(output_dir, name))
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def write_build_manifest(output_dir, artifacts, compress=False):
+    """按需压缩产物并写出构建清单，返回清单内容"""
+    if compress and brotli is None:
+        print("⚠️  未安装 brotli，仅生成 .gz 压缩文件")
+
+    files = {}
+    for name in artifacts:
+        path = os.path.join(output_dir, name)
+        entry = {'size': os.path.getsize(path)}
+        if not compress:
+            _remove_compressed(path)
+        else:
+            entry.update(compress_file(path))
+        files[name] = entry
+
+    manifest = {'files': files}
+    save_json(os.path.join(output_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def over_budget(manifest, budget_bytes):
+    """返回超出预算的页面 [(路径, 大小), ...]"""
+    return [
+        (name, entry['size'])
+        for name, entry in manifest['files'].items()
+        if name.endswith('.html') and entry['size'] > budget_bytes
+    ]
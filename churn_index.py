@@ -0,0 +1,119 @@
+"""
+代码热点索引 - 按路径前缀树聚合文件/目录的变更频度
+
+采集时只更新文件计数（file_*），目录的汇总在 rollup() 中自底向上一次算出。
+同一路径可能先后作为文件和目录出现（如 config 变为 config/x），两类计数分开保存。
+"""
+
+
+class ChurnNode:
+    """前缀树节点：修改次数、变更行数（增+删）与作者编号集合
+
+    file_* 为该路径作为文件时的计数；changes/lines/authors 为汇总后子树的合计（含自身文件计数）。
+    """
+
+    __slots__ = ('children', 'file_changes', 'file_lines', 'file_authors', 'changes', 'lines', 'authors')
+
+    def __init__(self):
+        self.children = {}
+        self.file_changes = 0
+        self.file_lines = 0
+        self.file_authors = set()
+        self.changes = 0
+        self.lines = 0
+        self.authors = set()
+
+
+class ChurnIndex:
+    """文件与目录的变更热点索引"""
+
+    def __init__(self):
+        self.root = ChurnNode()
+        self.rolled_up = False
+
+    def add(self, path, lines, author_id):
+        """记录一次文件变更（与提交统计在同一遍流式处理中调用）"""
+        node = self.root
+        for part in path.split('/'):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = ChurnNode()
+            node = child
+        node.file_changes += 1
+        node.file_lines += lines
+        node.file_authors.add(author_id)
+        self.rolled_up = False
+
+    def _iter_files(self, node=None, prefix=''):
+        node = node or self.root
+        for name, child in node.children.items():
+            path = f'{prefix}{name}'
+            if child.file_changes:
+                yield path, child
+            if child.children:
+                yield from self._iter_files(child, f'{path}/')
+
+    def rollup(self):
+        """自底向上汇总目录节点（后序遍历，非递归）"""
+        stack = [(self.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited and node.children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            children = node.children.values()
+            node.changes = node.file_changes + sum(child.changes for child in children)
+            node.lines = node.file_lines + sum(child.lines for child in children)
+            node.authors = node.file_authors.union(*(child.authors for child in children))
+        self.rolled_up = True
+
+    def hotspots(self, limit=10):
+        """返回按变更行数排序的 Top-N 文件和目录
+
+        每项为 (路径, 修改次数, 变更行数, 作者数)。
+        """
+        if not self.rolled_up:
+            self.rollup()
+
+        files = []
+        dirs = []
+        stack = [(self.root, '')]
+        while stack:
+            node, path = stack.pop()
+            for name, child in node.children.items():
+                child_path = f'{path}{name}'
+                if child.file_changes:
+                    files.append((child_path, child.file_changes, child.file_lines, len(child.file_authors)))
+                if child.children:
+                    # 目录只统计其下的内容，不含同名文件的历史
+                    dir_authors = set().union(*(grandchild.authors for grandchild in child.children.values()))
+                    dirs.append((
+                        child_path + '/',
+                        child.changes - child.file_changes,
+                        child.lines - child.file_lines,
+                        len(dir_authors)
+                    ))
+                    stack.append((child, child_path + '/'))
+
+        def top(entries):
+            return sorted(entries, key=lambda e: (-e[2], -e[1], e[0]))[:limit]
+
+        return top(files), top(dirs)
+
+    def to_dict(self):
+        """仅保存文件节点，目录在恢复后重新汇总"""
+        return [
+            [path, node.file_changes, node.file_lines, sorted(node.file_authors)]
+            for path, node in self._iter_files()
+        ]
+
+    def load(self, data):
+        for path, changes, lines, authors in data:
+            node = self.root
+            for part in path.split('/'):
+                node = node.children.setdefault(part, ChurnNode())
+            node.file_changes += changes
+            node.file_lines += lines
+            node.file_authors.update(authors)
+        self.rolled_up = False
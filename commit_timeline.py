@@ -0,0 +1,144 @@
+"""
+提交时间线 - 列式、驻留（interned）的紧凑存储
+"""
+
+import hashlib
+from array import array
+from datetime import datetime
+
+
+class TimelineEntry:
+    """时间线中的单条提交（按需从列式存储中读取，日期字符串在渲染时才生成）"""
+
+    __slots__ = ('timestamp', 'author', 'subject', 'is_merge', 'is_merge_like')
+
+    def __init__(self, timestamp, author, subject, is_merge, is_merge_like):
+        self.timestamp = timestamp
+        self.author = author
+        self.subject = subject
+        self.is_merge = is_merge
+        self.is_merge_like = is_merge_like
+
+    @property
+    def date(self):
+        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d')
+
+    @property
+    def time(self):
+        return datetime.fromtimestamp(self.timestamp).strftime('%H:%M')
+
+
+class CommitTimeline:
+    """列式存储的提交时间线
+
+    - 时间戳: array('q')
+    - 作者: 作者表中的编号 array('l')，作者名只保存一份
+    - 合并标记: 位图
+    - 提交信息: 共享的 UTF-8 缓冲区 + 偏移量
+    """
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.author_ids = array('l')
+        self.authors = []
+        self.author_index = {}
+        self.merge_bits = bytearray()
+        self.merge_like_bits = bytearray()
+        self.subject_buffer = bytearray()
+        self.subject_offsets = array('q', [0])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def intern_author(self, author):
+        """返回作者编号，首次出现时加入作者表"""
+        author_id = self.author_index.get(author)
+        if author_id is None:
+            author_id = self.author_index[author] = len(self.authors)
+            self.authors.append(author)
+        return author_id
+
+    @staticmethod
+    def _set_bit(bits, index, value):
+        if index & 7 == 0:
+            bits.append(0)
+        if value:
+            bits[index >> 3] |= 1 << (index & 7)
+
+    @staticmethod
+    def _get_bit(bits, index):
+        return bool(bits[index >> 3] & (1 << (index & 7)))
+
+    def append(self, timestamp, author, subject, is_merge=False, is_merge_like=False):
+        index = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.author_ids.append(self.intern_author(author))
+        self._set_bit(self.merge_bits, index, is_merge)
+        self._set_bit(self.merge_like_bits, index, is_merge_like)
+        self.subject_buffer += subject.encode('utf-8')
+        self.subject_offsets.append(len(self.subject_buffer))
+
+    def subject(self, index):
+        start = self.subject_offsets[index]
+        end = self.subject_offsets[index + 1]
+        return self.subject_buffer[start:end].decode('utf-8')
+
+    def __getitem__(self, index):
+        return TimelineEntry(
+            self.timestamps[index],
+            self.authors[self.author_ids[index]],
+            self.subject(index),
+            self._get_bit(self.merge_bits, index),
+            self._get_bit(self.merge_like_bits, index)
+        )
+
+    def sorted_indices(self, reverse=False):
+        """按时间戳排序的下标（排序稳定，与按字典列表排序的顺序一致）"""
+        return sorted(range(len(self.timestamps)), key=self.timestamps.__getitem__, reverse=reverse)
+
+    def iter_sorted(self, reverse=False):
+        """按时间戳排序依次产出提交"""
+        for index in self.sorted_indices(reverse):
+            yield self[index]
+
+    def is_merge(self, index):
+        return self._get_bit(self.merge_bits, index)
+
+    def is_merge_like(self, index):
+        return self._get_bit(self.merge_like_bits, index)
+
+    def digest(self):
+        """时间线内容的摘要（用于判断渲染结果能否复用）"""
+        digest = hashlib.sha1()
+        for column in (self.timestamps, self.author_ids, self.subject_offsets):
+            digest.update(column.tobytes())
+        digest.update(self.merge_bits)
+        digest.update(self.merge_like_bits)
+        digest.update(self.subject_buffer)
+        digest.update('\0'.join(self.authors).encode('utf-8'))
+        return digest.hexdigest()
+
+    def to_dict(self):
+        """转换为可 JSON 序列化的结构（用于检查点）"""
+        return {
+            'timestamps': self.timestamps.tolist(),
+            'author_ids': self.author_ids.tolist(),
+            'authors': self.authors,
+            'merge_bits': self.merge_bits.hex(),
+            'merge_like_bits': self.merge_like_bits.hex(),
+            'subjects': self.subject_buffer.decode('utf-8'),
+            'subject_offsets': self.subject_offsets.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        timeline = cls()
+        timeline.timestamps = array('q', data['timestamps'])
+        timeline.author_ids = array('l', data['author_ids'])
+        timeline.authors = list(data['authors'])
+        timeline.author_index = {author: i for i, author in enumerate(timeline.authors)}
+        timeline.merge_bits = bytearray.fromhex(data['merge_bits'])
+        timeline.merge_like_bits = bytearray.fromhex(data['merge_like_bits'])
+        timeline.subject_buffer = bytearray(data['subjects'].encode('utf-8'))
+        timeline.subject_offsets = array('q', data['subject_offsets'])
+        return timeline
@@ -0,0 +1,105 @@
+"""
+去重计数 - 统计每位作者修改过的不同文件数
+
+- exact: 路径驻留为整数编号，作者只保存编号集合（路径字符串全局只存一份）
+- approx: HyperLogLog 草图，每位作者占用固定大小的内存，误差可配置
+"""
+
+import math
+import hashlib
+
+
+class PathTable:
+    """路径驻留表：每个路径字符串只保存一份，对外使用整数编号"""
+
+    def __init__(self):
+        self.paths = []
+        self.index = {}
+
+    def load(self, paths):
+        """从检查点恢复（编号与保存时一致）"""
+        self.paths = list(paths)
+        self.index = {path: i for i, path in enumerate(self.paths)}
+
+    def intern(self, path):
+        path_id = self.index.get(path)
+        if path_id is None:
+            path_id = self.index[path] = len(self.paths)
+            self.paths.append(path)
+        return path_id
+
+
+class ExactDistinctCounter:
+    """精确去重计数（路径编号集合）"""
+
+    mode = 'exact'
+
+    def __init__(self, path_table):
+        self.path_table = path_table
+        self.ids = set()
+
+    def add(self, path):
+        self.ids.add(self.path_table.intern(path))
+
+    def count(self):
+        return len(self.ids)
+
+    def to_dict(self):
+        return sorted(self.ids)
+
+    def load(self, data):
+        self.ids.update(data)
+
+
+class HyperLogLogCounter:
+    """HyperLogLog 近似去重计数
+
+    标准误差约为 1.04 / sqrt(m)，m = 2^precision 为寄存器个数。
+    """
+
+    mode = 'approx'
+
+    def __init__(self, precision):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @staticmethod
+    def precision_for_error(error):
+        """根据期望的标准误差计算精度（4~16）"""
+        registers = (1.04 / error) ** 2
+        return min(16, max(4, math.ceil(math.log2(registers))))
+
+    def add(self, path):
+        # 使用稳定哈希，保证检查点中的草图在多次运行间可以合并
+        value = int.from_bytes(hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = value >> (64 - self.precision)
+        rest = (value << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = min(64 - rest.bit_length() + 1, 64 - self.precision + 1)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # 小基数时使用线性计数修正
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_dict(self):
+        return self.registers.hex()
+
+    def load(self, data):
+        for i, rank in enumerate(bytes.fromhex(data)):
+            if rank > self.registers[i]:
+                self.registers[i] = rank
+
+
+def create_counter_factory(mode='exact', error=0.02, path_table=None):
+    """返回创建去重计数器的工厂函数"""
+    if mode == 'approx':
+        precision = HyperLogLogCounter.precision_for_error(error)
+        return lambda: HyperLogLogCounter(precision)
+    return lambda: ExactDistinctCounter(path_table)
@@ -0,0 +1,179 @@
+"""
+文件清单 - 按 HEAD 树对象 SHA 缓存的文件总数与扩展名分布
+
+树未变化时直接复用缓存；树变化时只对比新旧两棵树的差异做增量更新，
+无需重新列出全部文件。
+"""
+
+import os
+import subprocess
+
+from stats_cache import load_json, save_json
+
+# 树对象条目类型：普通文件为 blob，子模块为 commit（与 git ls-files 一样计入文件数）
+SUBMODULE_MODE = b'160000'
+# 与 git 判断二进制文件的方式一致：前 8000 字节中出现 NUL 即视为二进制
+BINARY_SNIFF_BYTES = 8000
+
+
+def file_extension(path):
+    return os.path.splitext(path)[1] or 'no-extension'
+
+
+def list_head_blobs(repo_path):
+    """列出 HEAD 中的普通文件：[(blob SHA, 路径), ...]（跳过子模块与符号链接）"""
+    result = subprocess.run(['git', 'ls-tree', '-r', '-z', 'HEAD'], cwd=repo_path, capture_output=True)
+    blobs = []
+    for entry in result.stdout.split(b'\0'):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b'\t')
+        mode, obj_type, sha = meta.split(b' ')
+        if obj_type == b'blob' and mode != b'120000':
+            blobs.append((sha.decode('ascii'), path.decode('utf-8', 'surrogateescape')))
+    return blobs
+
+
+def is_binary(head):
+    """head 为文件开头的内容（至少前 BINARY_SNIFF_BYTES 字节，文件更短时为全部内容）"""
+    return b'\0' in head[:BINARY_SNIFF_BYTES]
+
+
+def retain_current(cache, current):
+    """只保留当前 HEAD 仍在使用的缓存条目，避免缓存无限增长"""
+    return {key: value for key, value in cache.items() if key in current}
+
+
+class FileInventory:
+    """HEAD 文件清单（总数、扩展名直方图、可选的各扩展名总字节数）"""
+
+    CACHE_VERSION = 1
+
+    def __init__(self, repo_path, cache_dir, with_sizes=False):
+        self.repo_path = repo_path
+        self.cache_path = os.path.join(cache_dir, 'inventory.json')
+        self.with_sizes = with_sizes
+
+    def _git(self, cmd, input_bytes=None):
+        result = subprocess.run(cmd, cwd=self.repo_path, input=input_bytes, capture_output=True)
+        return result.stdout if result.returncode == 0 else None
+
+    def head_tree(self):
+        output = self._git(['git', 'rev-parse', '--verify', '-q', 'HEAD^{tree}'])
+        return output.decode('ascii').strip() if output else None
+
+    def blob_sizes(self, shas):
+        """用一次 git cat-file --batch-check 查询多个 blob 的大小"""
+        if not shas:
+            return {}
+        output = self._git(
+            ['git', 'cat-file', '--batch-check=%(objectname) %(objectsize)'],
+            ('\n'.join(shas) + '\n').encode('ascii')
+        ) or b''
+        sizes = {}
+        for line in output.decode('ascii', 'replace').split('\n'):
+            parts = line.split(' ')
+            if len(parts) == 2 and parts[1].isdigit():
+                sizes[parts[0]] = int(parts[1])
+        return sizes
+
+    def _full_scan(self, tree):
+        """完整列出树中的所有文件"""
+        cmd = ['git', 'ls-tree', '-r', '-z']
+        if self.with_sizes:
+            cmd.append('-l')
+        output = self._git(cmd + [tree]) or b''
+        file_types = {}
+        sizes = {}
+        total = 0
+        for entry in output.split(b'\0'):
+            if not entry:
+                continue
+            meta, _, path = entry.partition(b'\t')
+            fields = meta.split()
+            ext = file_extension(path.decode('utf-8', 'replace'))
+            total += 1
+            file_types[ext] = file_types.get(ext, 0) + 1
+            if self.with_sizes and fields[1] == b'blob':
+                sizes[ext] = sizes.get(ext, 0) + int(fields[3])
+        return total, file_types, sizes
+
+    def _apply_diff(self, cache, old_tree, new_tree):
+        """按新旧树的差异增量更新缓存，失败时返回 False"""
+        output = self._git(['git', 'diff-tree', '-r', '-z', '--no-renames', old_tree, new_tree])
+        if output is None:
+            return False
+
+        # 原始格式: ":旧模式 新模式 旧SHA 新SHA 状态\0路径\0"
+        records = output.split(b'\0')
+        changes = []
+        for meta, path in zip(records[0::2], records[1::2]):
+            if not meta.startswith(b':'):
+                continue
+            old_mode, new_mode, old_sha, new_sha, status = meta[1:].split(b' ')
+            changes.append((old_mode, new_mode, old_sha.decode('ascii'), new_sha.decode('ascii'),
+                            status[:1], file_extension(path.decode('utf-8', 'replace'))))
+
+        file_types = cache['file_types']
+        sizes = cache['file_type_sizes']
+        if self.with_sizes:
+            blob_shas = set()
+            for old_mode, new_mode, old_sha, new_sha, status, ext in changes:
+                if status != b'A' and old_mode != SUBMODULE_MODE:
+                    blob_shas.add(old_sha)
+                if status != b'D' and new_mode != SUBMODULE_MODE:
+                    blob_shas.add(new_sha)
+            blob_size = self.blob_sizes(sorted(blob_shas))
+
+        for old_mode, new_mode, old_sha, new_sha, status, ext in changes:
+            if status == b'A':
+                cache['total_files'] += 1
+                file_types[ext] = file_types.get(ext, 0) + 1
+            elif status == b'D':
+                cache['total_files'] -= 1
+                file_types[ext] = file_types.get(ext, 0) - 1
+                if not file_types[ext]:
+                    del file_types[ext]
+            if self.with_sizes:
+                delta = 0
+                if status != b'A' and old_mode != SUBMODULE_MODE:
+                    delta -= blob_size.get(old_sha, 0)
+                if status != b'D' and new_mode != SUBMODULE_MODE:
+                    delta += blob_size.get(new_sha, 0)
+                sizes[ext] = sizes.get(ext, 0) + delta
+                if not sizes[ext] and ext not in file_types:
+                    del sizes[ext]
+        return True
+
+    def collect(self):
+        """返回 {'total_files': int, 'file_types': {扩展名: 文件数}, 'file_type_sizes': {扩展名: 字节数}}"""
+        tree = self.head_tree()
+        if not tree:
+            return {'total_files': 0, 'file_types': {}, 'file_type_sizes': {}}
+
+        cache = load_json(self.cache_path)
+        if cache and (cache.get('version') != self.CACHE_VERSION
+                      or (self.with_sizes and not cache.get('with_sizes'))):
+            cache = None
+
+        if cache and cache['tree'] == tree:
+            print("   文件清单: 树未变化，使用缓存")
+        elif cache and self._apply_diff(cache, cache['tree'], tree):
+            print("   文件清单: 按树差异增量更新")
+            if not self.with_sizes:
+                # 未更新字节数，旧的字节数统计已失效
+                cache['with_sizes'] = False
+                cache['file_type_sizes'] = {}
+        else:
+            total, file_types, sizes = self._full_scan(tree)
+            cache = {
+                'version': self.CACHE_VERSION,
+                'with_sizes': self.with_sizes,
+                'total_files': total,
+                'file_types': file_types,
+                'file_type_sizes': sizes,
+            }
+
+        cache['tree'] = tree
+        save_json(self.cache_path, cache)
+        return cache
@@ -5,9 +5,17 @@
 """
 
 import os
+import io
 import sys
-import subprocess
+import argparse
+import contextlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_stats import GitStatsGenerator
+from stats_cache import atomic_write
+from build_artifacts import minify_html, write_build_manifest, remove_build_outputs, over_budget
+from static_assets import hashed_name, publish_asset, prune_assets, asset_url, style_tag, script_tag
 
 # 项目配置
 PROJECTS = [
@@ -34,29 +42,21 @@ PROJECTS = [
     }
 ]
 
-def generate_portal(output_dir, total_stats):
-    """生成智能总门户页面"""
-    html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-  <meta charset="utf-8" />
-  <title>禾盈慧项目 - 多仓库协作统计总表</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <style>
-    * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+# 总门户样式与脚本（内联到页面中，或作为共享资源单独发布）
+PORTAL_CSS = """    * { margin: 0; padding: 0; box-sizing: border-box; }
     
-    html {{ scroll-behavior: smooth; }}
+    html { scroll-behavior: smooth; }
     
-    :root {{
+    :root {
       --primary: #667eea;
       --secondary: #764ba2;
       --success: #10b981;
       --dark: #1f2937;
       --light: #f9fafb;
       --border: #e5e7eb;
-    }}
+    }
     
-    body {{
+    body {
       font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", "PingFang SC", "Hiragino Sans GB", "Microsoft YaHei", sans-serif;
       background: linear-gradient(135deg, var(--primary) 0%, var(--secondary) 100%);
       min-height: 100vh;
@@ -65,108 +65,108 @@ def generate_portal(output_dir, total_stats):
       display: flex;
       align-items: center;
       justify-content: center;
-    }}
+    }
     
-    .container {{
+    .container {
       max-width: 1200px;
       width: 100%;
       animation: fadeIn 0.6s ease-out;
-    }}
+    }
     
-    @keyframes fadeIn {{
-      from {{ opacity: 0; transform: translateY(30px); }}
-      to {{ opacity: 1; transform: translateY(0); }}
-    }}
+    @keyframes fadeIn {
+      from { opacity: 0; transform: translateY(30px); }
+      to { opacity: 1; transform: translateY(0); }
+    }
     
-    .header {{
+    .header {
       text-align: center;
       color: white;
       margin-bottom: 48px;
-    }}
+    }
     
-    .brand {{
+    .brand {
       font-size: 18px;
       font-weight: 700;
       letter-spacing: 3px;
       text-transform: uppercase;
       margin-bottom: 16px;
       opacity: 0.95;
-    }}
+    }
     
-    .title {{
+    .title {
       font-size: 48px;
       font-weight: 800;
       margin-bottom: 16px;
       text-shadow: 0 4px 12px rgba(0,0,0,0.2);
-    }}
+    }
     
-    .subtitle {{
+    .subtitle {
       font-size: 18px;
       opacity: 0.9;
       line-height: 1.6;
-    }}
+    }
     
     /* 总览卡片 */
-    .overview {{
+    .overview {
       background: rgba(255, 255, 255, 0.95);
       border-radius: 20px;
       padding: 32px;
       margin-bottom: 40px;
       box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-    }}
+    }
     
-    .overview-title {{
+    .overview-title {
       font-size: 20px;
       font-weight: 700;
       margin-bottom: 24px;
       color: var(--dark);
       text-align: center;
-    }}
+    }
     
-    .stats-grid {{
+    .stats-grid {
       display: grid;
       grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
       gap: 24px;
-    }}
+    }
     
-    .stat-item {{
+    .stat-item {
       text-align: center;
       padding: 20px;
       background: linear-gradient(135deg, #f9fafb 0%, #f3f4f6 100%);
       border-radius: 12px;
-    }}
+    }
     
-    .stat-icon {{
+    .stat-icon {
       font-size: 32px;
       margin-bottom: 8px;
-    }}
+    }
     
-    .stat-label {{
+    .stat-label {
       font-size: 12px;
       color: #6b7280;
       text-transform: uppercase;
       letter-spacing: 0.5px;
       margin-bottom: 6px;
       font-weight: 600;
-    }}
+    }
     
-    .stat-value {{
+    .stat-value {
       font-size: 32px;
       font-weight: 700;
       background: linear-gradient(135deg, var(--primary), var(--secondary));
       -webkit-background-clip: text;
       -webkit-text-fill-color: transparent;
       background-clip: text;
-    }}
+    }
     
-    .card-container {{
+    .card-container {
       display: grid;
       grid-template-columns: repeat(auto-fit, minmax(320px, 1fr));
       gap: 24px;
       margin-bottom: 40px;
-    }}
+    }
     
-    .card {{
+    .card {
       background: white;
       border-radius: 20px;
       padding: 32px;
@@ -176,9 +176,9 @@ def generate_portal(output_dir, total_stats):
       transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
       position: relative;
       overflow: hidden;
-    }}
+    }
     
-    .card::before {{
+    .card::before {
       content: '';
       position: absolute;
       top: 0;
@@ -186,84 +186,118 @@ def generate_portal(output_dir, total_stats):
       right: 0;
       height: 4px;
       background: linear-gradient(90deg, var(--primary), var(--secondary));
-    }}
+    }
     
-    .card:hover {{
+    .card:hover {
       transform: translateY(-8px);
       box-shadow: 0 20px 40px rgba(0,0,0,0.3);
-    }}
+    }
     
-    .card-icon {{
+    .card-icon {
       font-size: 48px;
       margin-bottom: 16px;
-    }}
+    }
     
-    .card-title {{
+    .card-title {
       font-size: 24px;
       font-weight: 700;
       margin-bottom: 8px;
       color: var(--dark);
-    }}
+    }
     
-    .card-desc {{
+    .card-desc {
       font-size: 14px;
       color: #6b7280;
       line-height: 1.5;
       margin-bottom: 16px;
-    }}
+    }
     
-    .card-stats {{
+    .card-stats {
       display: flex;
       gap: 16px;
       font-size: 13px;
       color: #6b7280;
-    }}
+    }
     
-    .card-stat {{
+    .card-stat {
       display: flex;
       align-items: center;
       gap: 4px;
-    }}
+    }
     
-    .footer {{
+    .footer {
       background: rgba(255, 255, 255, 0.95);
       border-radius: 16px;
       padding: 24px;
       text-align: center;
       box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-    }}
+    }
     
-    .footer-title {{
+    .footer-title {
       font-size: 16px;
       font-weight: 600;
       margin-bottom: 12px;
       color: var(--dark);
-    }}
+    }
     
-    .footer-content {{
+    .footer-content {
       font-size: 14px;
       color: #6b7280;
       line-height: 1.6;
-    }}
+    }
     
-    .footer-content strong {{
+    .footer-content strong {
       color: var(--primary);
       font-weight: 600;
-    }}
+    }
     
     /* 打印样式 */
-    @media print {{
-      body {{ background: white; padding: 20px; }}
-      .container {{ box-shadow: none; }}
-      .card:hover {{ transform: none; }}
-    }}
-    
-    @media (max-width: 768px) {{
-      .title {{ font-size: 36px; }}
-      .card-container {{ grid-template-columns: 1fr; }}
-      .stats-grid {{ grid-template-columns: repeat(2, 1fr); }}
-    }}
-  </style>
+    @media print {
+      body { background: white; padding: 20px; }
+      .container { box-shadow: none; }
+      .card:hover { transform: none; }
+    }
+    
+    @media (max-width: 768px) {
+      .title { font-size: 36px; }
+      .card-container { grid-template-columns: 1fr; }
+      .stats-grid { grid-template-columns: repeat(2, 1fr); }
+    }
+"""
+
+PORTAL_JS = """    document.addEventListener('DOMContentLoaded', function() {
+      const cards = document.querySelectorAll('.card');
+      cards.forEach((card, index) => {
+        card.style.animation = `fadeIn 0.5s ease-out ${index * 0.1}s both`;
+      });
+    });
+"""
+
+
+def generate_portal(output_dir, total_stats, minify=False, assets_dir=None, compress=False):
+    """生成智能总门户页面，返回其引用的共享资源文件名"""
+    css, js = PORTAL_CSS, PORTAL_JS
+    if minify:
+        css, js = minify_html(css), minify_html(js)
+    if assets_dir:
+        # 共享资源模式：样式与脚本以内容哈希命名，页面只保留引用
+        css_name = publish_asset(assets_dir, 'portal', 'css', css, compress)
+        js_name = publish_asset(assets_dir, 'portal', 'js', js, compress)
+        styles = style_tag(css, href=asset_url(assets_dir, output_dir, css_name), indent='  ')
+        scripts = script_tag(js, src=asset_url(assets_dir, output_dir, js_name), indent='  ')
+        asset_names = [css_name, js_name]
+    else:
+        styles = style_tag(css, indent='  ')
+        scripts = script_tag(js, indent='  ')
+        asset_names = []
+    
+    html = f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+  <meta charset="utf-8" />
+  <title>禾盈慧项目 - 多仓库协作统计总表</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+{styles}
 </head>
 <body>
   <div class="container">
@@ -327,83 +361,96 @@ def generate_portal(output_dir, total_stats):
     </div>
   </div>
   
-  <script>
-    document.addEventListener('DOMContentLoaded', function() {
-      const cards = document.querySelectorAll('.card');
-      cards.forEach((card, index) => {
-        card.style.animation = `fadeIn 0.5s ease-out ${index * 0.1}s both`;
-      });
-    });
-  </script>
+"""
+    html += scripts
+    html += """
 </body>
 </html>"""
     
+    if minify:
+        html = minify_html(html)
+    
     output_file = os.path.join(output_dir, 'index.html')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    if os.path.exists(output_file):
+        with open(output_file, 'r', encoding='utf-8') as f:
+            if f.read() == html:
+                print(f"✅ 总门户未变化，保留原文件: {output_file}")
+                return asset_names
+    atomic_write(output_file, html)
     
     print(f"✅ 总门户已生成: {output_file}")
+    return asset_names
 
-def collect_repo_stats(repo_path):
-    """快速收集仓库统计数据"""
-    try:
-        # 总提交数
-        result = subprocess.run(
-            ['git', 'rev-list', '--count', 'HEAD'],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        commits = int(result.stdout.strip()) if result.returncode == 0 else 0
-        
-        # 总文件数
-        result = subprocess.run(
-            ['git', 'ls-files'],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        files = len([l for l in result.stdout.strip().split('\n') if l]) if result.returncode == 0 else 0
-        
-        # 代码行数统计（简化版）
-        result = subprocess.run(
-            ['git', 'log', '--all', '--numstat', '--pretty=format:'],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        additions = 0
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                parts = line.split('\t')
-                if len(parts) >= 1 and parts[0].isdigit():
-                    additions += int(parts[0])
-        
-        # Merge commits
-        result = subprocess.run(
-            ['git', 'log', '--all', '--merges', '--oneline'],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        merges = len([l for l in result.stdout.strip().split('\n') if l]) if result.returncode == 0 else 0
-        
-        return {
-            'commits': commits,
-            'files': files,
-            'additions': additions,
-            'merges': merges
-        }
-    except Exception as e:
-        print(f"⚠️  统计收集错误: {e}")
-        return {'commits': 0, 'files': 0, 'additions': 0, 'merges': 0}
+def process_project(project, output_root, options):
+    """处理单个项目：生成报告并返回其汇总
+
+    每个仓库的历史只由 GitStatsGenerator 遍历一次，总门户直接使用其汇总。
+    在工作进程中运行，输出被捕获后随结果一并返回，
+    由主进程按项目顺序打印，避免并发时日志交错。
+    """
+    repo_path = project['path']
+    output_dir = os.path.join(output_root, project['dir'])
+    result = {'stats': None, 'success': False, 'log': ''}
+    
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        if not os.path.exists(repo_path):
+            print(f"⚠️  跳过: 仓库路径不存在 - {repo_path}")
+        else:
+            try:
+                generator = GitStatsGenerator(repo_path, output_dir, project['name'], **options)
+                result['success'] = generator.generate()
+                if result['success']:
+                    result['stats'] = generator.get_summary()
+            except Exception as e:
+                print(f"❌ 错误: {e}")
+    
+    result['log'] = buffer.getvalue()
+    return result
+
+def run_projects(output_root, jobs, options):
+    """按给定并发度处理所有项目，结果顺序与 PROJECTS 一致"""
+    if jobs <= 1:
+        for project in PROJECTS:
+            yield process_project(project, str(output_root), options)
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(process_project, project, str(output_root), options)
+            for project in PROJECTS
+        ]
+        # 按提交顺序取结果，保证输出顺序与完成先后无关
+        for future in futures:
+            yield future.result()
 
 def main():
     """主函数：一键生成所有统计"""
+    parser = argparse.ArgumentParser(description='禾盈慧协作洞察工具 - 一键全量生成')
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=min(len(PROJECTS), os.cpu_count() or 1),
+        help='并发处理的仓库数（默认为 CPU 核数与仓库数的较小值）'
+    )
+    parser.add_argument('--minify', action='store_true', help='去掉 HTML 中的缩进与空行')
+    parser.add_argument('--compress', action='store_true', help='为 HTML/JSON 产物生成 .gz 与 .br 预压缩文件')
+    parser.add_argument('--size-budget', type=int, help='单个页面（未压缩）的体积上限，单位 KB，超出时构建失败')
+    parser.add_argument(
+        '--shared-assets',
+        action='store_true',
+        help='样式与脚本写入 project-reports/assets/（文件名含内容哈希），各报告与总门户共同引用'
+    )
+    args = parser.parse_args()
+    options = {'minify': args.minify, 'compress': args.compress, 'size_budget': args.size_budget}
+    
     script_dir = Path(__file__).parent
     output_root = script_dir / 'project-reports'
+    assets_dir = str(output_root / 'assets') if args.shared_assets else None
+    options['assets_dir'] = assets_dir
     
     print("🚀 禾盈慧协作洞察工具 - 一键全量生成")
+    print(f"   并发数: {max(args.jobs, 1)}")
     print("=" * 60)
     
     total_stats = {
@@ -412,51 +459,66 @@ def main():
         'total_additions': 0,
         'total_merges': 0
     }
+    summary_rows = []
     
     # 为每个项目生成统计
-    for i, project in enumerate(PROJECTS, 1):
+    for i, (project, result) in enumerate(zip(PROJECTS, run_projects(output_root, args.jobs, options)), 1):
         print(f"\n[{i}/{len(PROJECTS)}] 处理: {project['name']}")
         print("-" * 60)
+        print(result['log'], end='')
         
-        repo_path = project['path']
-        output_dir = output_root / project['dir']
-        
-        if not os.path.exists(repo_path):
-            print(f"⚠️  跳过: 仓库路径不存在 - {repo_path}")
+        repo_stats = result['stats']
+        if repo_stats is None:
+            status = '❌' if os.path.exists(project['path']) else '⚠️'
+            summary_rows.append((project['name'], status, None))
             continue
         
-        # 收集统计数据
-        print("   收集统计数据...")
-        repo_stats = collect_repo_stats(repo_path)
         total_stats['total_commits'] += repo_stats['commits']
         total_stats['total_files'] += repo_stats['files']
         total_stats['total_additions'] += repo_stats['additions']
         total_stats['total_merges'] += repo_stats['merges']
-        
-        # 调用原有的生成脚本
-        cmd = [
-            'python3',
-            str(script_dir / 'generate_stats.py'),
-            repo_path,
-            str(output_dir),
-            project['name']
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        print(result.stdout)
-        
-        if result.returncode != 0:
-            print(f"❌ 错误: {result.stderr}")
+        summary_rows.append((project['name'], '✅', repo_stats))
+    
+    print("\n" + "=" * 60)
+    print("📋 汇总:")
+    for name, status, repo_stats in summary_rows:
+        if repo_stats is None:
+            print(f"   {status} {name}: {'生成失败' if status == '❌' else '已跳过'}")
+        else:
+            print(
+                f"   {status} {name}: {repo_stats['commits']} 次提交, "
+                f"{repo_stats['files']} 个文件, +{repo_stats['additions']:,} 行, "
+                f"{repo_stats['merges']} 次合并"
+            )
     
     print("\n" + "=" * 60)
     print("📊 生成总门户页面...")
-    generate_portal(output_root, total_stats)
+    asset_names = generate_portal(output_root, total_stats, args.minify, assets_dir, args.compress)
+    portal_artifacts = ['index.html']
+    if assets_dir:
+        # 只保留本次各报告与总门户引用的资源，旧版本的哈希文件不再发布
+        css, js = GitStatsGenerator.report_assets(args.minify)
+        asset_names += [hashed_name('report', 'css', css), hashed_name('report', 'js', js)]
+        portal_artifacts += [f'assets/{name}' for name in prune_assets(assets_dir, set(asset_names))]
+    portal_ok = True
+    if args.compress or args.size_budget:
+        manifest = write_build_manifest(output_root, portal_artifacts, args.compress)
+        if args.size_budget:
+            for name, size in over_budget(manifest, args.size_budget * 1024):
+                print(f"❌ 错误: 总门户 {name} 大小 {GitStatsGenerator.format_size(size)} 超出预算 {args.size_budget} KB")
+                portal_ok = False
+    else:
+        remove_build_outputs(output_root, portal_artifacts)
     
     print("\n" + "=" * 60)
     print("✨ 所有统计报告已生成完毕！")
     print(f"📁 输出目录: {output_root}")
     print(f"🌐 访问入口: {output_root / 'index.html'}")
     print("\n💡 提示：使用浏览器打开 index.html 即可查看")
+    
+    # 任一报告生成失败（含超出体积预算）时以非零状态退出
+    if not portal_ok or any(status == '❌' for _, status, _ in summary_rows):
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
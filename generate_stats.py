@@ -6,13 +6,32 @@
 
 import subprocess
 import os
+import tempfile
 import sys
+import time
+import argparse
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import json
 import re
 import hashlib
-from html_template import get_compact_html_template
+import html
+from html_template import get_compact_html_template, get_report_assets
+from static_assets import publish_asset, asset_url, style_tag, script_tag
+from build_artifacts import minify_html, list_artifacts, write_build_manifest, remove_build_outputs, over_budget
+from report_writer import compile_template, write_template, FragmentCache
+from stats_cache import repo_cache_dir, load_json, save_json, atomic_write
+from author_resolver import AuthorResolver
+from time_buckets import create_time_buckets, encode_day_counts
+from commit_timeline import CommitTimeline
+from distinct_count import PathTable, create_counter_factory
+from stats_store import StatsStore
+from churn_index import ChurnIndex
+from ownership import OwnershipEngine
+from file_inventory import FileInventory
+from loc_counter import LocCounter
+from timeline_shards import write_timeline_shards, remove_timeline_shards
+from search_index import build_search_index
 
 class GitStatsGenerator:
     # 用户名到真实姓名的映射
@@ -35,53 +54,106 @@ class GitStatsGenerator:
         '张琪': '#8b5cf6',
     }
     
-    def __init__(self, repo_path, output_dir, repo_name):
+    # 检查点格式版本，格式变化时递增以触发全量重建
+    CHECKPOINT_VERSION = 6
+    # 区块或汇总的生成方式变化时递增，使缓存的区块片段与"报告已是最新"的判断失效
+    SECTION_VERSION = 2
+    
+    # 流式读取 git 输出时的块大小
+    STREAM_CHUNK_SIZE = 1 << 16
+    
+    # 提交信息中的 "merge" 字样，用于标记 Squash 合并等"类合并"提交
+    MERGE_SUBJECT_PATTERN = re.compile(r'\bmerge\b', re.IGNORECASE)
+    
+    def __init__(self, repo_path, output_dir, repo_name, cache_dir=None, full_rebuild=False,
+                 use_mailmap=False, merge_like_subjects=False, backend='auto',
+                 file_count_mode='exact', file_count_error=0.02, db_path=None,
+                 hotspot_limit=10, ownership=False, ownership_jobs=None, file_sizes=False,
+                 loc=False, loc_jobs=None, timeline_shards=False,
+                 minify=False, compress=False, size_budget=None, assets_dir=None):
         self.repo_path = os.path.abspath(repo_path)
         self.output_dir = os.path.abspath(output_dir)
         self.repo_name = repo_name
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else repo_cache_dir(self.repo_path)
+        self.full_rebuild = full_rebuild
+        # 使用 .mailmap 时由 git 先完成大部分作者归并（%aN/%aE）
+        self.use_mailmap = use_mailmap
+        # 是否按提交信息额外标记"类合并"提交（合并判定本身始终基于父提交数）
+        self.merge_like_subjects = merge_like_subjects
+        # 时间分桶聚合后端：auto/python/numpy
+        self.backend = backend
+        # 作者修改文件数的去重方式：exact（精确）/approx（HyperLogLog 估算）
+        self.file_count_mode = file_count_mode
+        self.file_count_error = file_count_error
+        self.path_table = PathTable()
+        self.new_file_counter = create_counter_factory(file_count_mode, file_count_error, self.path_table)
+        self.author_resolver = AuthorResolver(self.AUTHOR_MAPPING)
+        # 可选的 SQLite 统计数据库（提交、文件变更、作者），采集时增量写入
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self.store = None
+        # 跳过生成时从 summary.json 读取的汇总；本次生成的报告内容摘要
+        self.cached_summary = None
+        self.output_digest = None
+        # 代码热点榜单的条目数
+        self.hotspot_limit = hotspot_limit
+        # 是否基于 git blame 统计当前代码归属（较慢，结果按 blob 缓存）
+        self.ownership = ownership
+        self.ownership_jobs = ownership_jobs
+        # 文件清单是否统计各扩展名的总字节数
+        self.file_sizes = file_sizes
+        # 是否按扩展名统计 HEAD 中的代码行数（结果按 blob 缓存）
+        self.loc = loc
+        self.loc_jobs = loc_jobs
+        # 时间线是否按月写成 JSON 分片、由页面按需加载（否则全部内联到页面中）
+        self.timeline_shards = timeline_shards
+        # 发布产物：精简 HTML、预压缩（.gz/.br）与单页体积预算（KB，未压缩）
+        self.minify = minify
+        self.compress = compress
+        self.size_budget = size_budget
+        # 共享资源目录：指定时样式与脚本发布为内容哈希命名的文件，页面只保留引用
+        self.assets_dir = os.path.abspath(assets_dir) if assets_dir else None
         self.stats = {
-            'authors': defaultdict(lambda: {
-                'commits': 0,
-                'additions': 0,
-                'deletions': 0,
-                'first_commit': None,
-                'last_commit': None,
-                'files_changed': set(),
-                'commits_by_date': defaultdict(int),
-                'commits_by_hour': defaultdict(int),
-                'commits_by_weekday': defaultdict(int),
-                'merge_commits': 0,
-                'impact_score': 0  # 代码当量
-            }),
+            'authors': defaultdict(self._new_author_stats),
             'by_hour': defaultdict(int),
             'by_weekday': defaultdict(int),
             'by_month': defaultdict(int),
             'by_year': defaultdict(int),
             'by_hour_weekday': defaultdict(lambda: defaultdict(int)),  # 热力图数据
             'file_types': defaultdict(int),
+            'file_type_sizes': {},
             'total_commits': 0,
             'total_files': 0,
             'total_merge_commits': 0,
+            'total_merge_like_commits': 0,
             'first_commit_date': None,
             'last_commit_date': None,
-            'commit_timeline': [],
-            'daily_commits': defaultdict(int)
+            'commit_timeline': CommitTimeline(),
+            'daily_commits': defaultdict(int),
+            'churn': ChurnIndex(),  # 文件/目录变更热点
+            'ownership': defaultdict(int),  # 作者在 HEAD 中存活的代码行数
+            'loc_by_type': {}  # 各扩展名在 HEAD 中的代码行数
+        }
+    
+    def _new_author_stats(self):
+        """创建单个作者的空统计结构"""
+        return {
+            'commits': 0,
+            'additions': 0,
+            'deletions': 0,
+            'first_commit': None,
+            'last_commit': None,
+            'files_changed': self.new_file_counter(),
+            'commits_by_date': defaultdict(int),
+            'commits_by_hour': defaultdict(int),
+            'commits_by_weekday': defaultdict(int),
+            'merge_commits': 0,
+            'merge_like_commits': 0,
+            'impact_score': 0  # 代码当量
         }
     
-    def normalize_author(self, author):
+    def normalize_author(self, author, email=''):
         """规范化作者名称，使用真实姓名映射"""
-        # 尝试精确匹配
-        if author in self.AUTHOR_MAPPING:
-            return self.AUTHOR_MAPPING[author]
-        
-        # 尝试部分匹配（不区分大小写）
-        author_lower = author.lower()
-        for key, value in self.AUTHOR_MAPPING.items():
-            if key.lower() in author_lower or author_lower in key.lower():
-                return value
-        
-        # 如果没有匹配，返回原名
-        return author
+        return self.author_resolver.resolve(author, email)
     
     def get_author_color(self, author):
         """获取作者专属颜色"""
@@ -94,12 +166,22 @@ class GitStatsGenerator:
         # 简化公式：commits * 10 + additions + deletions * 0.5
         return int(commits * 10 + additions + deletions * 0.5)
     
-    def run_git_command(self, cmd):
+    @staticmethod
+    def format_size(size):
+        """将字节数格式化为易读的大小"""
+        for unit in ('B', 'KB', 'MB'):
+            if size < 1024:
+                return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+            size /= 1024
+        return f'{size:.1f} GB'
+    
+    def run_git_command(self, cmd, input_text=None):
         """运行 Git 命令并返回输出"""
         try:
             result = subprocess.run(
                 cmd,
                 cwd=self.repo_path,
+                input=input_text,
                 capture_output=True,
                 text=True,
                 shell=False
@@ -109,131 +191,364 @@ class GitStatsGenerator:
             print(f"Error running command {' '.join(cmd)}: {e}")
             return ""
     
+    def stream_git_command(self, cmd, input_text=None, separator=b'\n'):
+        """以流式方式运行 Git 命令，按分隔符逐条产出原始字节记录
+
+        以固定大小的块读取管道，边读边处理，内存占用与历史长度无关。
+        input_text 用于通过 --stdin 传入大量修订号。
+        输出读完后命令以非零状态退出时抛出 subprocess.CalledProcessError（附带 stderr），
+        调用方据此放弃本次结果，避免把不完整的历史当作完整结果保存。
+        """
+        # stderr 写入临时文件：与 stdout 同时走管道时，stderr 写满会使 git 阻塞
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                shell=False
+            )
+        except Exception as e:
+            stderr_file.close()
+            print(f"Error running command {' '.join(cmd)}: {e}")
+            raise
+        
+        with stderr_file:
+            if input_text is not None:
+                # git log --stdin 会先读完全部输入再开始输出，这里一次写入即可
+                proc.stdin.write(input_text.encode('utf-8'))
+                proc.stdin.close()
+            
+            try:
+                pending = b''
+                for chunk in iter(lambda: proc.stdout.read(self.STREAM_CHUNK_SIZE), b''):
+                    records = (pending + chunk).split(separator)
+                    pending = records.pop()
+                    yield from records
+                if pending:
+                    yield pending
+            finally:
+                proc.stdout.close()
+                proc.wait()
+            
+            # 只在完整读完输出后检查（调用方提前停止读取时 git 可能因管道关闭而异常退出）
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode('utf-8', 'replace').strip()
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    
     def collect_basic_info(self):
         """收集基本仓库信息"""
         # 总提交数
         output = self.run_git_command(['git', 'rev-list', '--count', 'HEAD'])
         self.stats['total_commits'] = int(output) if output else 0
         
-        # 总文件数
-        output = self.run_git_command(['git', 'ls-files'])
-        files = output.split('\n') if output else []
-        self.stats['total_files'] = len([f for f in files if f])
-        
-        # 文件类型统计
-        for f in files:
-            if f:
-                ext = os.path.splitext(f)[1] or 'no-extension'
-                self.stats['file_types'][ext] += 1
-    
-    def collect_commit_stats(self):
-        """收集提交统计信息"""
-        # 获取提交日志：时间戳、作者、文件变更统计
-        log_format = '%at|%an|%ae|%s'
-        output = self.run_git_command([
-            'git', 'log', '--all', '--numstat', 
-            f'--pretty=format:COMMIT|{log_format}'
-        ])
-        
-        if not output:
+        # 总文件数与文件类型统计（按 HEAD 树缓存，树变化时按差异增量更新）
+        inventory = FileInventory(self.repo_path, self.cache_dir, self.file_sizes).collect()
+        self.stats['total_files'] = inventory['total_files']
+        self.stats['file_types'].update(inventory['file_types'])
+        self.stats['file_type_sizes'] = inventory['file_type_sizes']
+    
+    def get_ref_tips(self):
+        """获取所有引用（及 HEAD）当前指向的对象，等价于 git log --all 的起点"""
+        output = self.run_git_command(['git', 'for-each-ref', '--format=%(objectname)'])
+        tips = set(output.split('\n')) if output else set()
+        head = self.run_git_command(['git', 'rev-parse', '--verify', '-q', 'HEAD'])
+        if head:
+            tips.add(head)
+        tips.discard('')
+        return sorted(tips)
+    
+    def _config_fingerprint(self):
+        """影响聚合结果的配置指纹，变化时检查点失效"""
+        config = {
+            'version': self.CHECKPOINT_VERSION,
+            'author_mapping': self.AUTHOR_MAPPING,
+            'use_mailmap': self.use_mailmap,
+            'mailmap': self._mailmap_digest() if self.use_mailmap else None,
+            'merge_like_subjects': self.merge_like_subjects,
+            'file_count': [self.file_count_mode, self.file_count_error],
+            'timezone': [time.timezone, time.altzone, list(time.tzname)],
+        }
+        payload = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _mailmap_digest(self):
+        """git 实际使用的 mailmap 内容摘要：工作区 .mailmap、mailmap.file 与 mailmap.blob"""
+        digest = hashlib.sha1()
+        mailmap_file = self.run_git_command(['git', 'config', '--path', '--get', 'mailmap.file'])
+        for path in [os.path.join(self.repo_path, '.mailmap'), mailmap_file]:
+            if path:
+                path = os.path.join(self.repo_path, path)
+                if os.path.isfile(path):
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+            digest.update(b'\0')
+        mailmap_blob = self.run_git_command(['git', 'config', '--get', 'mailmap.blob'])
+        if mailmap_blob:
+            digest.update(self.run_git_command(['git', 'cat-file', 'blob', mailmap_blob]).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _checkpoint_path(self):
+        return os.path.join(self.cache_dir, 'checkpoint.json')
+    
+    def load_checkpoint(self):
+        """读取检查点，版本或配置不一致时视为无效"""
+        checkpoint = load_json(self._checkpoint_path())
+        if not checkpoint or checkpoint.get('fingerprint') != self._config_fingerprint():
+            return None
+        return checkpoint
+    
+    def save_checkpoint(self, tips):
+        """保存已处理的引用位置及聚合结果"""
+        save_json(self._checkpoint_path(), {
+            'fingerprint': self._config_fingerprint(),
+            'repo_path': self.repo_path,
+            'tips': tips,
+            'stats': self._serialize_stats(),
+        })
+    
+    def is_fast_forward(self, old_tips, tips):
+        """检查旧的引用位置是否全部仍可从当前引用到达
+
+        有引用被强制推送、改写或删除时，旧提交会变得不可达，
+        此时已保存的聚合结果不再可信，需要全量重建。
+        """
+        if not old_tips:
+            return True
+        revs = old_tips + [f'^{t}' for t in tips]
+        output = self.run_git_command(['git', 'rev-list', '--count', '--stdin'], '\n'.join(revs) + '\n')
+        return output == '0'
+    
+    def _serialize_stats(self):
+        """将提交相关的聚合结果转换为可 JSON 序列化的结构"""
+        authors = {}
+        for author, data in self.stats['authors'].items():
+            authors[author] = dict(data, files_changed=data['files_changed'].to_dict())
+        return {
+            'authors': authors,
+            'paths': self.path_table.paths,
+            'by_hour': self.stats['by_hour'],
+            'by_weekday': self.stats['by_weekday'],
+            'by_month': self.stats['by_month'],
+            'by_year': self.stats['by_year'],
+            'by_hour_weekday': self.stats['by_hour_weekday'],
+            'total_merge_commits': self.stats['total_merge_commits'],
+            'total_merge_like_commits': self.stats['total_merge_like_commits'],
+            'first_commit_date': self.stats['first_commit_date'],
+            'last_commit_date': self.stats['last_commit_date'],
+            'commit_timeline': self.stats['commit_timeline'].to_dict(),
+            'daily_commits': self.stats['daily_commits'],
+            'churn': self.stats['churn'].to_dict(),
+        }
+    
+    def _restore_stats(self, saved):
+        """从检查点恢复聚合结果（JSON 会把整数键变为字符串，这里还原）"""
+        def int_keys(d):
+            return defaultdict(int, {int(k): v for k, v in d.items()})
+        
+        self.path_table.load(saved['paths'])
+        for author, data in saved['authors'].items():
+            author_stats = self.stats['authors'][author]
+            files_changed = author_stats['files_changed']
+            author_stats.update(data)
+            files_changed.load(data['files_changed'])
+            author_stats['files_changed'] = files_changed
+            author_stats['commits_by_date'] = defaultdict(int, data['commits_by_date'])
+            author_stats['commits_by_hour'] = int_keys(data['commits_by_hour'])
+            author_stats['commits_by_weekday'] = int_keys(data['commits_by_weekday'])
+        
+        self.stats['by_hour'] = int_keys(saved['by_hour'])
+        self.stats['by_weekday'] = int_keys(saved['by_weekday'])
+        self.stats['by_month'] = defaultdict(int, saved['by_month'])
+        self.stats['by_year'] = int_keys(saved['by_year'])
+        for weekday, hours in saved['by_hour_weekday'].items():
+            self.stats['by_hour_weekday'][int(weekday)] = int_keys(hours)
+        self.stats['total_merge_commits'] = saved['total_merge_commits']
+        self.stats['total_merge_like_commits'] = saved['total_merge_like_commits']
+        self.stats['first_commit_date'] = saved['first_commit_date']
+        self.stats['last_commit_date'] = saved['last_commit_date']
+        self.stats['commit_timeline'] = CommitTimeline.from_dict(saved['commit_timeline'])
+        self.stats['daily_commits'] = defaultdict(int, saved['daily_commits'])
+        self.stats['churn'].load(saved['churn'])
+    
+    def collect_history(self, tips=None):
+        """收集提交历史，优先基于检查点增量更新"""
+        tips = tips if tips is not None else self.get_ref_tips()
+        checkpoint = None if self.full_rebuild else self.load_checkpoint()
+        
+        if checkpoint and not self.is_fast_forward(checkpoint['tips'], tips):
+            print("   检测到引用被改写，执行全量重建")
+            checkpoint = None
+        
+        if self.db_path:
+            self.store = StatsStore(self.db_path)
+            if checkpoint and self.store.repo_tips(self.repo_path) != checkpoint['tips']:
+                print("   统计数据库与检查点不同步，执行全量重建")
+                checkpoint = None
+            self.store.begin_repo(self.repo_path, self.repo_name, full_rebuild=checkpoint is None)
+        
+        try:
+            if checkpoint:
+                self._restore_stats(checkpoint['stats'])
+                old_tips = set(checkpoint['tips'])
+                new_tips = [t for t in tips if t not in old_tips]
+                print(f"   增量更新: {len(new_tips)} 个新引用位置")
+                if new_tips:
+                    self.collect_commit_stats(new_tips + [f'^{t}' for t in checkpoint['tips']])
+            else:
+                self.collect_commit_stats(tips)
+            
+            # 只有完整遍历后才保存检查点与提交数据库；出错时异常直接抛出，
+            # 未提交的数据库写入在关闭连接时丢弃
+            self.save_checkpoint(tips)
+            if self.store:
+                self.store.commit_repo(tips)
+        finally:
+            if self.store:
+                self.store.close()
+                self.store = None
+    
+    def collect_commit_stats(self, revs):
+        """收集提交统计信息
+
+        revs 为要遍历的修订号（支持 ^排除），通过 --stdin 传给 git log。
+        使用 git log -z 输出：提交头以 \\x1e 开头、字段以 \\x1f 分隔，
+        文件变更条目以 NUL 结尾，直接在字节上解析，只解码实际用到的字段。
+        """
+        if not revs:
+            return
+        
+        # 获取提交日志：时间戳、作者、父提交、提交信息、文件变更统计
+        author_format = '%aN%x1f%aE' if self.use_mailmap else '%an%x1f%ae'
+        log_format = f'%H%x1f%at%x1f{author_format}%x1f%P%x1f%s%x1f'
+        records = self.stream_git_command([
+            'git', 'log', '--stdin', '-z', '--numstat',
+            f'--pretty=format:%x1e{log_format}'
+        ], '\n'.join(revs) + '\n', separator=b'\0')
+        time_buckets = create_time_buckets(self.stats, self.backend)
+        author_cache = {}
+        author_stats = None
+        commit_id = None
+        # 重命名条目形如 "增\t删\t\0旧路径\0新路径\0"，需要再读取两个路径
+        rename_paths = 0
+        rename_change = None
+        
+        for record in records:
+            if rename_paths:
+                rename_paths -= 1
+                if rename_paths == 0:
+                    self._record_file_change(
+                        author_stats, author_id, commit_id, rename_change[0], rename_change[1], record
+                    )
+                continue
+            
+            if not record:
+                continue
+            
+            if record[0] == 0x1e:
+                # 解析提交信息（最后一个字段是提交头之后紧跟的第一条文件变更）
+                fields = record[1:].split(b'\x1f', 6)
+                if len(fields) < 7:
+                    author_stats = None
+                    continue
+                sha, timestamp_raw, name_raw, email_raw, parents, subject_raw, record = fields
+                timestamp = int(timestamp_raw)
+                subject = subject_raw.decode('utf-8', 'replace')
+                
+                # 规范化作者名（按原始字节缓存，同一作者只解码一次）
+                author = author_cache.get((name_raw, email_raw))
+                if author is None:
+                    author = author_cache[(name_raw, email_raw)] = self.normalize_author(
+                        name_raw.decode('utf-8', 'replace'),
+                        email_raw.decode('utf-8', 'replace')
+                    )
+                
+                # 检测是否为 Merge commit：有多个父提交
+                is_merge = b' ' in parents
+                is_merge_like = (
+                    self.merge_like_subjects and not is_merge
+                    and self.MERGE_SUBJECT_PATTERN.search(subject) is not None
+                )
+                
+                # 更新作者统计
+                author_stats = self.stats['authors'][author]
+                author_id = self.stats['commit_timeline'].intern_author(author)
+                author_stats['commits'] += 1
+                
+                if is_merge:
+                    author_stats['merge_commits'] += 1
+                    self.stats['total_merge_commits'] += 1
+                elif is_merge_like:
+                    author_stats['merge_like_commits'] += 1
+                    self.stats['total_merge_like_commits'] += 1
+                
+                if author_stats['first_commit'] is None or timestamp < author_stats['first_commit']:
+                    author_stats['first_commit'] = timestamp
+                if author_stats['last_commit'] is None or timestamp > author_stats['last_commit']:
+                    author_stats['last_commit'] = timestamp
+                
+                # 时间统计（小时/星期/日/月/年及热力图）
+                time_buckets.add(timestamp, author)
+                
+                # 提交时间线（完整版，列式存储，日期在渲染时生成）
+                self.stats['commit_timeline'].append(timestamp, author, subject, is_merge, is_merge_like)
+                
+                if self.store:
+                    commit_id = self.store.add_commit(sha.decode('ascii'), timestamp, author, subject, is_merge)
+                
+                # 仓库首次和最后提交
+                if self.stats['first_commit_date'] is None or timestamp < self.stats['first_commit_date']:
+                    self.stats['first_commit_date'] = timestamp
+                if self.stats['last_commit_date'] is None or timestamp > self.stats['last_commit_date']:
+                    self.stats['last_commit_date'] = timestamp
+                
+                record = record.lstrip(b'\n')
+                if not record:
+                    continue
+            
+            if author_stats is None:
+                continue
+            
+            # 解析文件变更统计
+            additions, _, rest = record.partition(b'\t')
+            deletions, _, path = rest.partition(b'\t')
+            if path:
+                self._record_file_change(author_stats, author_id, commit_id, additions, deletions, path)
+            else:
+                rename_paths = 2
+                rename_change = (additions, deletions)
+        
+        time_buckets.flush()
+    
+    def _record_file_change(self, author_stats, author_id, commit_id, additions, deletions, path):
+        """累计单条文件变更（二进制文件的增删行数为 "-"）"""
+        try:
+            additions = int(additions) if additions != b'-' else 0
+            deletions = int(deletions) if deletions != b'-' else 0
+        except ValueError:
             return
         
-        lines = output.split('\n')
-        current_commit = None
-        
-        for line in lines:
-            if line.startswith('COMMIT|'):
-                # 解析提交信息
-                parts = line[7:].split('|')
-                if len(parts) >= 4:
-                    timestamp = int(parts[0])
-                    raw_author = parts[1]
-                    email = parts[2]
-                    subject = parts[3]
-                    
-                    # 规范化作者名
-                    author = self.normalize_author(raw_author)
-                    
-                    dt = datetime.fromtimestamp(timestamp)
-                    date_str = dt.strftime('%Y-%m-%d')
-                    
-                    # 检测是否为 Merge commit
-                    is_merge = bool(re.search(r'\bmerge\b', subject, re.IGNORECASE))
-                    
-                    current_commit = {
-                        'author': author,
-                        'timestamp': timestamp,
-                        'date': dt,
-                        'subject': subject,
-                        'additions': 0,
-                        'deletions': 0,
-                        'files': [],
-                        'is_merge': is_merge
-                    }
-                    
-                    # 更新作者统计
-                    author_stats = self.stats['authors'][author]
-                    author_stats['commits'] += 1
-                    author_stats['commits_by_date'][date_str] += 1
-                    author_stats['commits_by_hour'][dt.hour] += 1
-                    author_stats['commits_by_weekday'][dt.weekday()] += 1
-                    
-                    if is_merge:
-                        author_stats['merge_commits'] += 1
-                        self.stats['total_merge_commits'] += 1
-                    
-                    if author_stats['first_commit'] is None or timestamp < author_stats['first_commit']:
-                        author_stats['first_commit'] = timestamp
-                    if author_stats['last_commit'] is None or timestamp > author_stats['last_commit']:
-                        author_stats['last_commit'] = timestamp
-                    
-                    # 时间统计
-                    self.stats['by_hour'][dt.hour] += 1
-                    self.stats['by_weekday'][dt.weekday()] += 1
-                    self.stats['by_month'][dt.strftime('%Y-%m')] += 1
-                    self.stats['by_year'][dt.year] += 1
-                    
-                    # 热力图数据：按星期几和小时统计
-                    self.stats['by_hour_weekday'][dt.weekday()][dt.hour] += 1
-                    
-                    # 提交时间线（完整版）
-                    self.stats['commit_timeline'].append({
-                        'date': date_str,
-                        'time': dt.strftime('%H:%M'),
-                        'timestamp': timestamp,
-                        'author': author,
-                        'subject': subject,
-                        'is_merge': is_merge
-                    })
-                    
-                    # 每日提交统计
-                    self.stats['daily_commits'][date_str] += 1
-                    
-                    # 仓库首次和最后提交
-                    if self.stats['first_commit_date'] is None or timestamp < self.stats['first_commit_date']:
-                        self.stats['first_commit_date'] = timestamp
-                    if self.stats['last_commit_date'] is None or timestamp > self.stats['last_commit_date']:
-                        self.stats['last_commit_date'] = timestamp
-                        
-            elif current_commit and line.strip() and not line.startswith('COMMIT|'):
-                # 解析文件变更统计
-                parts = line.split('\t')
-                if len(parts) >= 3:
-                    try:
-                        additions = int(parts[0]) if parts[0] != '-' else 0
-                        deletions = int(parts[1]) if parts[1] != '-' else 0
-                        filename = parts[2]
-                        
-                        current_commit['additions'] += additions
-                        current_commit['deletions'] += deletions
-                        current_commit['files'].append(filename)
-                        
-                        author = current_commit['author']
-                        self.stats['authors'][author]['additions'] += additions
-                        self.stats['authors'][author]['deletions'] += deletions
-                        self.stats['authors'][author]['files_changed'].add(filename)
-                    except (ValueError, IndexError):
-                        pass
+        path = path.decode('utf-8', 'replace')
+        author_stats['additions'] += additions
+        author_stats['deletions'] += deletions
+        author_stats['files_changed'].add(path)
+        self.stats['churn'].add(path, additions + deletions, author_id)
+        
+        if self.store:
+            self.store.add_file_change(commit_id, path, additions, deletions)
+    
+    def collect_ownership(self):
+        """统计当前代码归属（按规范化后的作者汇总存活行数）"""
+        engine = OwnershipEngine(self.repo_path, self.cache_dir, self.ownership_jobs)
+        for (name, email), lines in engine.compute().items():
+            self.stats['ownership'][self.normalize_author(name, email)] += lines
+    
+    def collect_loc(self):
+        """统计当前代码各扩展名的行数"""
+        self.stats['loc_by_type'] = LocCounter(self.repo_path, self.cache_dir, self.loc_jobs).compute()
     
     def finalize_stats(self):
         """完成统计，计算衍生指标"""
@@ -246,9 +561,15 @@ class GitStatsGenerator:
             )
     
     def generate_html(self):
-        """生成紧凑型 HTML 报告"""
+        """生成紧凑型 HTML 报告（各区块由生成器产出，边生成边写入文件）"""
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # 写出任何产物前先作废构建状态：本次若中途失败（如超出体积预算），
+        # 下次运行不会把残留的页面当作最新，也不会因内容摘要相同而保留它
+        build = self.load_build_state()
+        previous_digest = build.get('output') if build.get('output_dir') == self.output_dir else None
+        self.clear_build_state()
+        
         # 准备数据
         authors_sorted = sorted(
             self.stats['authors'].items(),
@@ -256,140 +577,334 @@ class GitStatsGenerator:
             reverse=True
         )
         
-        weekday_names = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
+        # 修改文件数列：估算模式下在表头标明
+        if self.file_count_mode == 'approx':
+            files_column_label = f'文件数 (估算 ±{self.file_count_error:.0%})'
+        else:
+            files_column_label = '文件数'
         
-        # 生成作者选项（用于时间线筛选）
-        author_options = ''
-        for author, _ in authors_sorted:
-            author_options += f'                            <option value="{author}">{author}</option>\n'
+        # 现存行数列（仅在统计代码归属时显示）
+        ownership_header = '\n                            <th style="width: 90px;">现存行数</th>' if self.ownership else ''
+        
+        # 代码热点（文件与目录）
+        hot_files, hot_dirs = self.stats['churn'].hotspots(self.hotspot_limit)
         
-        # 生成作者行
-        authors_rows = ''
-        for idx, (author, data) in enumerate(authors_sorted[:20], 1):
+        # 时间线与搜索索引：分片模式下页面只记录清单位置
+        timeline = self.stats['commit_timeline']
+        if self.timeline_shards:
+            manifest = write_timeline_shards(
+                timeline, self.output_dir, self.get_author_color, build_search_index(timeline)
+            )
+            timeline_attrs = f' data-shards="{manifest}"'
+            timeline_items = ''
+            timeline_index = ''
+        else:
+            remove_timeline_shards(self.output_dir)
+            # 内联的时间线与索引随历史线性增长，时间线未变化时复用上次的渲染结果
+            fragments = FragmentCache(self.cache_dir)
+            timeline_key = fragments.key(
+                self.SECTION_VERSION,
+                timeline.digest(),
+                self.AUTHOR_COLORS,
+                [time.timezone, time.altzone, list(time.tzname)]
+            )
+            timeline_attrs = ''
+            timeline_items = fragments.section('timeline_items', timeline_key, self._iter_timeline_items)
+            timeline_index = fragments.section('timeline_index', timeline_key, self._render_timeline_index)
+        
+        styles, scripts = self._asset_tags()
+        
+        # 获取模板并流式填充（生成时间不计入内容摘要）
+        template = get_compact_html_template()
+        output_file = os.path.join(self.output_dir, 'index.html')
+        content_digest, written = write_template(output_file, template, {
+            'repo_name': self.repo_name,
+            'styles': styles,
+            'scripts': scripts,
+            'generated_time': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'total_commits': self.stats['total_commits'],
+            'total_authors': len(self.stats['authors']),
+            'total_files': self.stats['total_files'],
+            'total_additions': sum(a['additions'] for a in self.stats['authors'].values()),
+            'authors_rows': self._iter_author_rows(authors_sorted[:20]),
+            'files_column_label': files_column_label,
+            'ownership_header': ownership_header,
+            'author_options': self._iter_author_options(authors_sorted),
+            'timeline_attrs': timeline_attrs,
+            'timeline_items': timeline_items,
+            'timeline_index': timeline_index,
+            'chart_data': self._render_chart_data(),
+            'loc_chart': self._render_loc_chart(),
+            'hotspot_limit': self.hotspot_limit,
+            'hotspot_file_rows': self._iter_hotspot_rows(hot_files),
+            'hotspot_dir_rows': self._iter_hotspot_rows(hot_dirs)
+        }, volatile={'generated_time'}, previous_digest=previous_digest, minify=self.minify)
+        self.output_digest = content_digest
+        
+        if written:
+            print(f"✅ 报告已生成: {output_file}")
+        else:
+            print(f"✅ 报告内容未变化，保留原文件: {output_file}")
+    
+    def _iter_author_options(self, authors_sorted):
+        """作者选项（用于时间线筛选）"""
+        for author, _ in authors_sorted:
+            yield f'                            <option value="{author}">{author}</option>\n'
+    
+    def _iter_author_rows(self, authors):
+        """作者贡献表格行"""
+        files_prefix = '≈' if self.file_count_mode == 'approx' else ''
+        for idx, (author, data) in enumerate(authors, 1):
             first_date = datetime.fromtimestamp(data['first_commit']).strftime('%Y-%m-%d') if data['first_commit'] else 'N/A'
             last_date = datetime.fromtimestamp(data['last_commit']).strftime('%Y-%m-%d') if data['last_commit'] else 'N/A'
             color = self.get_author_color(author)
+            ownership_cell = (
+                f'\n                            <td style="font-weight: 600;">{self.stats["ownership"].get(author, 0):,}</td>'
+                if self.ownership else ''
+            )
             
-            authors_rows += f"""                        <tr>
+            yield f"""                        <tr>
                             <td><span class="badge" style="background: {color};">#{idx}</span></td>
                             <td><strong>{author}</strong></td>
                             <td>{data['commits']}</td>
                             <td style="color: var(--success); font-weight: 600;">+{data['additions']:,}</td>
-                            <td style="color: var(--danger); font-weight: 600;">-{data['deletions']:,}</td>
-                            <td>{len(data['files_changed'])}</td>
+                            <td style="color: var(--danger); font-weight: 600;">-{data['deletions']:,}</td>{ownership_cell}
+                            <td>{files_prefix}{data['files_changed'].count()}</td>
                             <td><strong>{data['impact_score']:,}</strong></td>
                             <td style="font-size: 11px; color: #6b7280;">{first_date}</td>
                             <td style="font-size: 11px; color: #6b7280;">{last_date}</td>
                         </tr>
 """
+    
+    @staticmethod
+    def report_assets(minify=False):
+        """报告页面实际使用的样式与脚本 (css, js)"""
+        css, js = get_report_assets()
+        if minify:
+            css, js = minify_html(css), minify_html(js)
+        return css, js
+    
+    def _asset_tags(self):
+        """页面的样式与脚本：默认内联，指定共享资源目录时改为引用外部文件"""
+        css, js = self.report_assets(self.minify)
+        if not self.assets_dir:
+            return style_tag(css), script_tag(js)
         
-        # 生成时间线（完整版，不限制数量）
-        timeline_sorted = sorted(
-            self.stats['commit_timeline'],
-            key=lambda x: x['timestamp'],
-            reverse=True
+        css_name = publish_asset(self.assets_dir, 'report', 'css', css, self.compress)
+        js_name = publish_asset(self.assets_dir, 'report', 'js', js, self.compress)
+        return (
+            style_tag(css, href=asset_url(self.assets_dir, self.output_dir, css_name)),
+            script_tag(js, src=asset_url(self.assets_dir, self.output_dir, js_name))
         )
-        
-        timeline_items = ''
-        for commit in timeline_sorted:
-            merge_class = ' merge' if commit.get('is_merge') else ''
-            color = self.get_author_color(commit['author'])
-            timeline_items += f"""                        <div class="timeline-item{merge_class}" style="border-left: 3px solid {color};">
-                            <div class="timeline-date">{commit['date']} {commit.get('time', '')}</div>
-                            <div class="timeline-author" style="color: {color};">{commit['author']}</div>
-                            <div class="timeline-subject">{commit['subject'][:120]}</div>
+    
+    def _render_timeline_index(self):
+        """时间线搜索索引（内联到 <script> 中，需转义 "</"）"""
+        search_index = build_search_index(self.stats['commit_timeline'])
+        return json.dumps(search_index, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    
+    def _iter_timeline_items(self):
+        """时间线条目（完整版，不限制数量）"""
+        for commit in self.stats['commit_timeline'].iter_sorted(reverse=True):
+            merge_class = ' merge' if commit.is_merge else (' merge-like' if commit.is_merge_like else '')
+            color = self.get_author_color(commit.author)
+            yield f"""                        <div class="timeline-item{merge_class}" style="border-left: 3px solid {color};">
+                            <div class="timeline-date">{commit.date} {commit.time}</div>
+                            <div class="timeline-author" style="color: {color};">{commit.author}</div>
+                            <div class="timeline-subject">{commit.subject[:120]}</div>
                         </div>
 """
-        
-        # 生成小时分布条形图
-        hour_data = [self.stats['by_hour'].get(h, 0) for h in range(24)]
-        max_hour = max(hour_data) if hour_data and max(hour_data) > 0 else 1
-        hour_bars = ''
-        for hour in range(24):
-            count = hour_data[hour]
-            width = (count / max_hour * 100) if max_hour > 0 else 0
-            hour_bars += f"""                            <div class="bar">
-                                <div class="bar-label">{hour:02d}:00</div>
-                                <div class="bar-track">
-                                    <div class="bar-fill" style="width: {width}%">{count if count > 0 else ''}</div>
-                                </div>
-                            </div>
-"""
-        
-        # 生成星期分布
-        weekday_data = [self.stats['by_weekday'].get(d, 0) for d in range(7)]
-        max_weekday = max(weekday_data) if weekday_data and max(weekday_data) > 0 else 1
-        weekday_bars = ''
-        for day in range(7):
-            count = weekday_data[day]
-            width = (count / max_weekday * 100) if max_weekday > 0 else 0
-            weekday_bars += f"""                            <div class="bar">
-                                <div class="bar-label">{weekday_names[day]}</div>
-                                <div class="bar-track">
-                                    <div class="bar-fill" style="width: {width}%">{count if count > 0 else ''}</div>
-                                </div>
-                            </div>
-"""
-        
-        # 文件类型
+    
+    def _render_chart_data(self):
+        """图表数据（内联到 <script> 中，由页面脚本绘制为 SVG 条形图）
+
+        - hour / weekday: 按小时、星期的提交数（标签由页面生成）
+        - filetype / loc: Top 10 的标签与数值，texts 为条形上显示的文字（缺省时显示数值）
+        - month: 最近 12 个月的标签与数值，max 为全部月份的最大值（条形宽度按其归一）
+        - heatmap: 星期×小时热力图，cells 为按星期展开的 168 个计数（下标 = 星期 × 24 + 小时）；
+          各成员只附带按小时（24）、按星期（7）的计数，由页面按需估算其热力图
+        - calendar: 全部历史的提交日历，all 与 authors（顺序同 heatmap.authors）均为
+          encode_day_counts 编码的整数流
+        """
         file_types_sorted = sorted(
             self.stats['file_types'].items(),
-            key=lambda x: x[1],
-            reverse=True
+            key=lambda x: (-x[1], x[0])
         )[:10]
-        max_files = max([count for _, count in file_types_sorted]) if file_types_sorted else 1
-        filetype_bars = ''
-        for ext, count in file_types_sorted:
-            width = (count / max_files * 100) if max_files > 0 else 0
-            display_ext = ext if ext != 'no-extension' else '无扩展名'
-            filetype_bars += f"""                            <div class="bar">
-                                <div class="bar-label">{display_ext}</div>
-                                <div class="bar-track">
-                                    <div class="bar-fill" style="width: {width}%">{count}</div>
-                                </div>
-                            </div>
-"""
+        filetype = {
+            'labels': [ext if ext != 'no-extension' else '无扩展名' for ext, _ in file_types_sorted],
+            'values': [count for _, count in file_types_sorted]
+        }
+        if self.file_sizes:
+            filetype['texts'] = [
+                f"{count} · {self.format_size(self.stats['file_type_sizes'].get(ext, 0))}"
+                for ext, count in file_types_sorted
+            ]
         
-        # 月度趋势
         months_sorted = sorted(self.stats['by_month'].keys())
         month_commits = [self.stats['by_month'][m] for m in months_sorted]
-        max_month = max(month_commits) if month_commits and max(month_commits) > 0 else 1
-        month_bars = ''
-        for month, count in zip(months_sorted[-12:], month_commits[-12:]):
-            width = (count / max_month * 100) if max_month > 0 else 0
-            month_bars += f"""                            <div class="bar">
-                                <div class="bar-label">{month}</div>
-                                <div class="bar-track">
-                                    <div class="bar-fill" style="width: {width}%">{count if count > 0 else ''}</div>
-                                </div>
-                            </div>
-"""
         
-        # 获取模板并填充
-        template = get_compact_html_template()
-        html = template.format(
-            repo_name=self.repo_name,
-            generated_time=datetime.now().strftime('%Y-%m-%d %H:%M'),
-            total_commits=self.stats['total_commits'],
-            total_authors=len(self.stats['authors']),
-            total_files=self.stats['total_files'],
-            total_additions=sum(a['additions'] for a in self.stats['authors'].values()),
-            authors_rows=authors_rows,
-            author_options=author_options,
-            timeline_items=timeline_items,
-            hour_bars=hour_bars,
-            weekday_bars=weekday_bars,
-            filetype_bars=filetype_bars,
-            month_bars=month_bars
+        authors_sorted = sorted(
+            self.stats['authors'].items(),
+            key=lambda x: x[1]['commits'],
+            reverse=True
         )
+        by_hour_weekday = self.stats['by_hour_weekday']
+        heatmap = {
+            'cells': [by_hour_weekday[d].get(h, 0) if d in by_hour_weekday else 0 for d in range(7) for h in range(24)],
+            'authors': [author for author, _ in authors_sorted],
+            'hours': [[data['commits_by_hour'].get(h, 0) for h in range(24)] for _, data in authors_sorted],
+            'weekdays': [[data['commits_by_weekday'].get(d, 0) for d in range(7)] for _, data in authors_sorted]
+        }
         
-        # 写入文件
-        output_file = os.path.join(self.output_dir, 'index.html')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html)
+        charts = {
+            'hour': [self.stats['by_hour'].get(h, 0) for h in range(24)],
+            'weekday': [self.stats['by_weekday'].get(d, 0) for d in range(7)],
+            'filetype': filetype,
+            'month': {
+                'labels': months_sorted[-12:],
+                'values': month_commits[-12:],
+                'max': max(month_commits) if month_commits else 0
+            },
+            'heatmap': heatmap,
+            'calendar': {
+                'all': encode_day_counts(self.stats['daily_commits']),
+                'authors': [encode_day_counts(data['commits_by_date']) for _, data in authors_sorted]
+            }
+        }
+        if self.loc:
+            loc_sorted = sorted(
+                self.stats['loc_by_type'].items(),
+                key=lambda x: (-x[1], x[0])
+            )[:10]
+            charts['loc'] = {
+                'labels': [ext if ext != 'no-extension' else '无扩展名' for ext, _ in loc_sorted],
+                'values': [lines for _, lines in loc_sorted],
+                'texts': [f'{lines:,}' for _, lines in loc_sorted]
+            }
+        return json.dumps(charts, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    
+    def _render_loc_chart(self):
+        """Top 10 代码行数图表容器（仅在统计代码行数时显示）"""
+        if not self.loc:
+            return ''
+        return """
+                    <div class="chart-box">
+                        <div class="chart-title">Top 10 代码行数</div>
+                        <div class="bar-chart" data-chart="loc"></div>
+                    </div>"""
+    
+    def _iter_hotspot_rows(self, entries):
+        """热点表格行"""
+        for idx, (path, changes, lines, authors) in enumerate(entries, 1):
+            yield f"""                        <tr>
+                            <td>{idx}</td>
+                            <td style="word-break: break-all;" title="{html.escape(path)}">{html.escape(path)}</td>
+                            <td>{changes}</td>
+                            <td>{lines:,}</td>
+                            <td>{authors}</td>
+                        </tr>
+"""
+    
+    def get_summary(self):
+        """返回供总门户使用的机器可读汇总"""
+        if self.cached_summary is not None:
+            return self.cached_summary
+        return {
+            'repo_name': self.repo_name,
+            'commits': self.stats['total_commits'],
+            'files': self.stats['total_files'],
+            'additions': sum(a['additions'] for a in self.stats['authors'].values()),
+            'deletions': sum(a['deletions'] for a in self.stats['authors'].values()),
+            'merges': self.stats['total_merge_commits'],
+            'authors': len(self.stats['authors']),
+        }
+    
+    def write_summary(self):
+        """将汇总写入输出目录下的 summary.json"""
+        output_file = os.path.join(self.output_dir, 'summary.json')
+        atomic_write(output_file, json.dumps(self.get_summary(), ensure_ascii=False, indent=2))
+    
+    def finalize_artifacts(self):
+        """预压缩产物、写出构建清单并检查体积预算，超出预算时返回 False"""
+        artifacts = list_artifacts(self.output_dir)
+        if not (self.compress or self.size_budget):
+            remove_build_outputs(self.output_dir, artifacts)
+            return True
         
-        print(f"✅ 报告已生成: {output_file}")
-
+        manifest = write_build_manifest(self.output_dir, artifacts, self.compress)
+        page = manifest['files'].get('index.html', {})
+        sizes = [f"{self.format_size(page.get('size', 0))}"]
+        if 'gzip' in page:
+            sizes.append(f"gzip {self.format_size(page['gzip'])}")
+        if 'brotli' in page:
+            sizes.append(f"brotli {self.format_size(page['brotli'])}")
+        print(f"   页面大小: {' / '.join(sizes)}")
+        
+        if self.size_budget:
+            exceeded = over_budget(manifest, self.size_budget * 1024)
+            for name, size in exceeded:
+                print(f"❌ 错误: {name} 大小 {self.format_size(size)} 超出预算 {self.size_budget} KB")
+            if exceeded:
+                return False
+        return True
+    
+    def _build_state_path(self):
+        return os.path.join(self.cache_dir, 'build.json')
+    
+    def load_build_state(self):
+        """上次生成报告时的输入摘要与内容摘要"""
+        return load_json(self._build_state_path()) or {}
+    
+    def clear_build_state(self):
+        path = self._build_state_path()
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def save_build_state(self, input_digest):
+        save_json(self._build_state_path(), {
+            'input': input_digest,
+            'output': self.output_digest,
+            'output_dir': self.output_dir,
+        })
+    
+    def input_digest(self, tips):
+        """影响报告内容的全部输入的摘要：引用位置、映射配置、模板版本与生成选项"""
+        head = self.run_git_command(['git', 'rev-parse', '--verify', '-q', 'HEAD'])
+        config = {
+            'fingerprint': self._config_fingerprint(),
+            'tips': tips,
+            'head': head,
+            'author_colors': self.AUTHOR_COLORS,
+            'template': compile_template(get_compact_html_template()).digest,
+            'assets': hashlib.sha1(''.join(get_report_assets()).encode('utf-8')).hexdigest(),
+            'section_version': self.SECTION_VERSION,
+            'options': {
+                'repo_name': self.repo_name,
+                'output_dir': self.output_dir,
+                'hotspot_limit': self.hotspot_limit,
+                'ownership': self.ownership,
+                'file_sizes': self.file_sizes,
+                'loc': self.loc,
+                'timeline_shards': self.timeline_shards,
+                'minify': self.minify,
+                'compress': self.compress,
+                'size_budget': self.size_budget,
+                'assets_dir': self.assets_dir,
+                'db_path': self.db_path,
+            },
+        }
+        payload = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def is_up_to_date(self, input_digest):
+        """输入未变化且上次的输出仍然存在"""
+        build = self.load_build_state()
+        if self.full_rebuild or build.get('input') != input_digest or build.get('output_dir') != self.output_dir:
+            return False
+        if not os.path.exists(os.path.join(self.output_dir, 'index.html')):
+            return False
+        self.cached_summary = load_json(os.path.join(self.output_dir, 'summary.json'))
+        return self.cached_summary is not None
+    
     def generate(self):
         """生成完整统计报告"""
         print(f"📊 正在分析仓库: {self.repo_name}")
@@ -399,31 +914,101 @@ class GitStatsGenerator:
             print(f"❌ 错误: {self.repo_path} 不是 Git 仓库")
             return False
         
+        tips = self.get_ref_tips()
+        input_digest = self.input_digest(tips)
+        if self.is_up_to_date(input_digest):
+            print("✅ 报告已是最新 (up to date)，跳过生成")
+            return True
+        
         print("   收集基本信息...")
         self.collect_basic_info()
         
         print("   分析提交历史...")
-        self.collect_commit_stats()
+        try:
+            self.collect_history(tips)
+        except subprocess.CalledProcessError as e:
+            # 历史读取不完整：不保存检查点、不提交数据库，下次运行会重新遍历
+            print(f"❌ 错误: 读取提交历史失败 (git 退出码 {e.returncode})")
+            if e.stderr:
+                print(f"   {e.stderr}")
+            return False
+        
+        if self.ownership:
+            print("   统计代码归属...")
+            self.collect_ownership()
+        
+        if self.loc:
+            print("   统计代码行数...")
+            self.collect_loc()
         
         print("   计算衍生指标...")
         self.finalize_stats()
         
         print("   生成 HTML 报告...")
         self.generate_html()
+        self.write_summary()
+        if not self.finalize_artifacts():
+            return False
+        self.save_build_state(input_digest)
         
         return True
 
 
 def main():
-    if len(sys.argv) < 4:
-        print("用法: python3 generate_stats.py <仓库路径> <输出目录> <仓库名称>")
-        sys.exit(1)
-    
-    repo_path = sys.argv[1]
-    output_dir = sys.argv[2]
-    repo_name = sys.argv[3]
+    parser = argparse.ArgumentParser(description='禾盈慧 Git 仓库统计生成器')
+    parser.add_argument('repo_path', help='仓库路径')
+    parser.add_argument('output_dir', help='输出目录')
+    parser.add_argument('repo_name', help='仓库名称')
+    parser.add_argument('--full', action='store_true', help='忽略检查点，全量重建统计')
+    parser.add_argument('--cache-dir', help='检查点缓存目录（默认为脚本目录下的 .cache/）')
+    parser.add_argument('--mailmap', action='store_true', help='使用仓库的 .mailmap 归并作者（%%aN/%%aE）')
+    parser.add_argument('--backend', choices=['auto', 'python', 'numpy'], default='auto',
+                        help='时间分桶聚合后端（auto: 已安装 NumPy 时使用向量化实现）')
+    parser.add_argument('--file-count', choices=['exact', 'approx'], default='exact',
+                        help='作者修改文件数的去重方式（approx: HyperLogLog 估算，内存固定）')
+    parser.add_argument('--file-count-error', type=float, default=0.02,
+                        help='approx 模式的目标标准误差（默认 0.02）')
+    parser.add_argument('--hotspots', type=int, default=10, help='代码热点榜单条目数（默认 10）')
+    parser.add_argument('--ownership', action='store_true', help='基于 git blame 统计每位作者在当前代码中的存活行数')
+    parser.add_argument('--ownership-jobs', type=int, help='并发 blame 的进程数（默认为 CPU 核数）')
+    parser.add_argument('--loc', action='store_true', help='按扩展名统计当前代码的行数')
+    parser.add_argument('--loc-jobs', type=int, help='并发读取文件内容的进程数（默认为 CPU 核数）')
+    parser.add_argument('--timeline-shards', action='store_true',
+                        help='时间线按月写成 JSON 分片并由页面按需加载（需通过 HTTP 访问报告）')
+    parser.add_argument('--minify', action='store_true', help='去掉 HTML 中的缩进与空行')
+    parser.add_argument('--compress', action='store_true',
+                        help='为 HTML/JSON 产物生成 .gz 与 .br（需安装 brotli）预压缩文件，并写出 build-manifest.json')
+    parser.add_argument('--size-budget', type=int, help='单个页面（未压缩）的体积上限，单位 KB，超出时构建失败')
+    parser.add_argument('--assets-dir', help='将样式与脚本发布到该目录（内容哈希命名，多个报告共享），页面只保留引用')
+    parser.add_argument('--file-sizes', action='store_true', help='在文件类型分布中显示各类型的总大小')
+    parser.add_argument('--db', help='同时写入 SQLite 统计数据库（可用 stats_store.py 查询）')
+    parser.add_argument('--merge-like', action='store_true', help='将提交信息含 merge 的普通提交标记为"类合并"（Squash 合并流程）')
+    args = parser.parse_args()
     
-    generator = GitStatsGenerator(repo_path, output_dir, repo_name)
+    generator = GitStatsGenerator(
+        args.repo_path,
+        args.output_dir,
+        args.repo_name,
+        cache_dir=args.cache_dir,
+        full_rebuild=args.full,
+        use_mailmap=args.mailmap,
+        merge_like_subjects=args.merge_like,
+        backend=args.backend,
+        file_count_mode=args.file_count,
+        file_count_error=args.file_count_error,
+        db_path=args.db,
+        hotspot_limit=args.hotspots,
+        ownership=args.ownership,
+        ownership_jobs=args.ownership_jobs,
+        file_sizes=args.file_sizes,
+        loc=args.loc,
+        loc_jobs=args.loc_jobs,
+        timeline_shards=args.timeline_shards,
+        minify=args.minify,
+        compress=args.compress,
+        size_budget=args.size_budget,
+        assets_dir=args.assets_dir
+    )
     success = generator.generate()
     
     sys.exit(0 if success else 1)
@@ -1,21 +1,16 @@
 """
 HTML模板生成器 - 紧凑型心流式设计
+
+槽位写作 {{ name }} 或 {{ name:格式 }}，其余花括号（CSS/JS）均按字面输出，无需转义。
+样式与脚本单独存放，由生成器内联到页面或发布为共享资源（{{ styles }} / {{ scripts }}）。
 """
 
-def get_compact_html_template():
-    """返回紧凑型HTML模板字符串"""
-    return """<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{repo_name} - 禾盈慧项目统计</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+# 报告样式（内联到 <style> 中，或作为共享资源单独发布）
+REPORT_CSS = """        * { margin: 0; padding: 0; box-sizing: border-box; }
         
-        html {{ scroll-behavior: smooth; }}
+        html { scroll-behavior: smooth; }
         
-        :root {{
+        :root {
             --primary: #667eea;
             --secondary: #764ba2;
             --success: #10b981;
@@ -23,63 +18,63 @@ def get_compact_html_template():
             --dark: #1f2937;
             --light: #f9fafb;
             --border: #e5e7eb;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
             background: #f3f4f6;
             color: var(--dark);
             line-height: 1.4;
             padding: 16px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 4px 12px rgba(0,0,0,0.08);
             overflow: hidden;
-        }}
+        }
         
         /* 紧凑型Header */
-        .header {{
+        .header {
             background: linear-gradient(135deg, var(--primary), var(--secondary));
             color: white;
             padding: 24px 32px;
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .brand {{ font-size: 12px; opacity: 0.9; letter-spacing: 1px; }}
-        .header h1 {{ font-size: 28px; margin: 4px 0; }}
-        .subtitle {{ font-size: 13px; opacity: 0.85; }}
+        .brand { font-size: 12px; opacity: 0.9; letter-spacing: 1px; }
+        .header h1 { font-size: 28px; margin: 4px 0; }
+        .subtitle { font-size: 13px; opacity: 0.85; }
         
         /* 紧凑型Stats Grid - 强制4列 */
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(4, 1fr);
             border-bottom: 1px solid var(--border);
             background: white;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             padding: 16px 12px;
             text-align: center;
             border-right: 1px solid var(--border);
-        }}
+        }
         
-        .stat-card:last-child {{ border-right: none; }}
+        .stat-card:last-child { border-right: none; }
         
-        .stat-card .icon {{ font-size: 24px; margin-bottom: 6px; }}
-        .stat-card .label {{ font-size: 11px; color: #6b7280; text-transform: uppercase; margin-bottom: 4px; }}
-        .stat-card .value {{ font-size: 24px; font-weight: 700; color: var(--primary); }}
+        .stat-card .icon { font-size: 24px; margin-bottom: 6px; }
+        .stat-card .label { font-size: 11px; color: #6b7280; text-transform: uppercase; margin-bottom: 4px; }
+        .stat-card .value { font-size: 24px; font-weight: 700; color: var(--primary); }
         
         /* 内容区 - 紧凑padding */
-        .content {{ padding: 24px 32px; }}
+        .content { padding: 24px 32px; }
         
-        .back-link {{
+        .back-link {
             display: inline-flex;
             align-items: center;
             gap: 6px;
@@ -88,31 +83,31 @@ def get_compact_html_template():
             font-size: 13px;
             font-weight: 600;
             margin-bottom: 16px;
-        }}
+        }
         
         /* Section - 减小间距 */
-        .section {{ margin-bottom: 32px; }}
+        .section { margin-bottom: 32px; }
         
-        .section-header {{
+        .section-header {
             display: flex;
             align-items: center;
             gap: 8px;
             margin-bottom: 12px;
             padding-bottom: 8px;
             border-bottom: 2px solid var(--border);
-        }}
+        }
         
-        .section-header h2 {{ font-size: 20px; flex: 1; }}
-        .section-header .icon {{ font-size: 20px; }}
+        .section-header h2 { font-size: 20px; flex: 1; }
+        .section-header .icon { font-size: 20px; }
         
         /* 紧凑型表格 */
-        .data-table {{
+        .data-table {
             width: 100%;
             border-collapse: collapse;
             font-size: 13px;
-        }}
+        }
         
-        .data-table th {{
+        .data-table th {
             background: #f9fafb;
             padding: 8px 12px;
             text-align: left;
@@ -120,16 +115,16 @@ def get_compact_html_template():
             text-transform: uppercase;
             color: #6b7280;
             font-weight: 600;
-        }}
+        }
         
-        .data-table td {{
+        .data-table td {
             padding: 8px 12px;
             border-top: 1px solid var(--border);
-        }}
+        }
         
-        .data-table tbody tr:hover {{ background: #f9fafb; }}
+        .data-table tbody tr:hover { background: #f9fafb; }
         
-        .badge {{
+        .badge {
             display: inline-flex;
             padding: 3px 8px;
             background: var(--primary);
@@ -137,101 +132,84 @@ def get_compact_html_template():
             border-radius: 12px;
             font-size: 11px;
             font-weight: 700;
-        }}
+        }
         
         /* 2栏布局 - 图表并列 */
-        .chart-grid {{
+        .chart-grid {
             display: grid;
             grid-template-columns: repeat(2, 1fr);
             gap: 20px;
             margin: 16px 0;
-        }}
+        }
         
-        .chart-box {{
+        .chart-box {
             background: #f9fafb;
             border-radius: 8px;
             padding: 16px;
-        }}
-        
-        .chart-title {{ font-size: 14px; font-weight: 600; margin-bottom: 12px; color: var(--dark); }}
-        
-        /* 紧凑型条形图 */
-        .bar-chart {{ display: flex; flex-direction: column; gap: 6px; }}
-        
-        .bar {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }}
-        
-        .bar-label {{ min-width: 70px; font-size: 12px; color: #4b5563; }}
-        
-        .bar-track {{
-            flex: 1;
-            height: 20px;
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: inset 0 1px 2px rgba(0,0,0,0.05);
-        }}
-        
-        .bar-fill {{
-            height: 100%;
-            background: linear-gradient(90deg, var(--primary), var(--secondary));
-            display: flex;
-            align-items: center;
-            justify-content: flex-end;
-            padding-right: 8px;
-            color: white;
-            font-size: 11px;
-            font-weight: 700;
-            min-width: 30px;
-        }}
+        }
+        
+        .chart-title { font-size: 14px; font-weight: 600; margin-bottom: 12px; color: var(--dark); }
+        
+        /* 紧凑型条形图（由脚本根据 chartData 绘制为 SVG） */
+        .bar-chart svg { display: block; width: 100%; overflow: visible; }
+        .bar-label { font-size: 12px; fill: #4b5563; }
+        .bar-track { fill: white; }
+        .bar-text { font-size: 11px; font-weight: 700; fill: white; }
+        .bar-gradient-start { stop-color: var(--primary); }
+        .bar-gradient-end { stop-color: var(--secondary); }
+        
+        /* 星期×小时热力图 */
+        .heatmap-header { display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px; }
+        .heatmap-header .chart-title, .heatmap-header .filter-controls { margin-bottom: 0; }
+        .heatmap svg { display: block; width: 100%; }
+        .heatmap-cell { fill: var(--primary); }
+        .heatmap-cell.empty { fill: #e5e7eb; }
+        .heatmap-note { margin-top: 8px; font-size: 11px; color: #6b7280; }
         
         /* 筛选控件 */
-        .filter-controls {{
+        .filter-controls {
             display: flex;
             gap: 12px;
             margin-bottom: 16px;
             flex-wrap: wrap;
             align-items: center;
-        }}
+        }
         
-        .filter-controls label {{
+        .filter-controls label {
             font-size: 12px;
             color: #6b7280;
             font-weight: 600;
-        }}
+        }
         
-        .filter-controls select, .filter-controls input {{
+        .filter-controls select, .filter-controls input {
             padding: 6px 12px;
             border: 1px solid var(--border);
             border-radius: 6px;
             font-size: 12px;
             background: white;
             cursor: pointer;
-        }}
+        }
         
-        .filter-controls select:focus, .filter-controls input:focus {{
+        .filter-controls select:focus, .filter-controls input:focus {
             outline: none;
             border-color: var(--primary);
-        }}
+        }
         
         /* 折叠式时间线 */
-        .timeline-container {{
+        .timeline-container {
             background: #f9fafb;
             border-radius: 8px;
             padding: 16px;
             max-height: 400px;
             overflow-y: auto;
-        }}
+        }
         
-        .timeline {{
+        .timeline {
             position: relative;
             padding-left: 24px;
-        }}
+        }
         
-        .timeline::before {{
+        .timeline::before {
             content: '';
             position: absolute;
             left: 6px;
@@ -239,9 +217,9 @@ def get_compact_html_template():
             bottom: 0;
             width: 2px;
             background: linear-gradient(180deg, var(--primary), var(--secondary));
-        }}
+        }
         
-        .timeline-item {{
+        .timeline-item {
             position: relative;
             margin-bottom: 12px;
             padding: 8px 12px;
@@ -249,9 +227,9 @@ def get_compact_html_template():
             border-radius: 6px;
             font-size: 12px;
             box-shadow: 0 1px 3px rgba(0,0,0,0.08);
-        }}
+        }
         
-        .timeline-item::before {{
+        .timeline-item::before {
             content: '';
             position: absolute;
             left: -18px;
@@ -261,42 +239,563 @@ def get_compact_html_template():
             border-radius: 50%;
             background: white;
             border: 2px solid var(--primary);
-        }}
+        }
+        
+        .timeline-item.merge::before { background: var(--success); border-color: var(--success); }
+        .timeline-item.merge-like::before { border-color: var(--success); border-style: dashed; }
         
-        .timeline-item.merge::before {{ background: var(--success); border-color: var(--success); }}
+        .timeline-date { font-size: 10px; color: #9ca3af; font-weight: 600; }
+        .timeline-author { font-weight: 600; color: var(--primary); margin: 2px 0; }
+        .timeline-subject { color: #4b5563; line-height: 1.4; }
         
-        .timeline-date {{ font-size: 10px; color: #9ca3af; font-weight: 600; }}
-        .timeline-author {{ font-weight: 600; color: var(--primary); margin: 2px 0; }}
-        .timeline-subject {{ color: #4b5563; line-height: 1.4; }}
+        /* 虚拟列表（内联与分片模式共用）：固定行高，只渲染可见窗口 */
+        .timeline.virtual .timeline-item {
+            position: absolute;
+            left: 24px;
+            right: 0;
+            height: 64px;
+            margin: 0;
+            overflow: hidden;
+        }
+        .timeline.virtual .timeline-subject { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
         
         /* 打印样式 */
-        @media print {{
-            body {{ background: white; padding: 0; }}
-            .back-link, .timeline-container {{ display: none; }}
-            .section {{ page-break-inside: avoid; }}
-            .chart-grid {{ grid-template-columns: 1fr; }}
-        }}
+        @media print {
+            body { background: white; padding: 0; }
+            .back-link, .timeline-container { display: none; }
+            .section { page-break-inside: avoid; }
+            .chart-grid { grid-template-columns: 1fr; }
+        }
         
         /* 响应式 */
-        @media (max-width: 768px) {{
-            .stats-grid {{ grid-template-columns: repeat(2, 1fr); }}
-            .chart-grid {{ grid-template-columns: 1fr; }}
-            .content {{ padding: 16px; }}
-        }}
+        @media (max-width: 768px) {
+            .stats-grid { grid-template-columns: repeat(2, 1fr); }
+            .chart-grid { grid-template-columns: 1fr; }
+            .content { padding: 16px; }
+        }
         
         /* Scrollbar美化 */
-        .timeline-container::-webkit-scrollbar {{ width: 6px; }}
-        .timeline-container::-webkit-scrollbar-track {{ background: #f1f1f1; }}
-        .timeline-container::-webkit-scrollbar-thumb {{ background: var(--primary); border-radius: 3px; }}
-    </style>
+        .timeline-container::-webkit-scrollbar { width: 6px; }
+        .timeline-container::-webkit-scrollbar-track { background: #f1f1f1; }
+        .timeline-container::-webkit-scrollbar-thumb { background: var(--primary); border-radius: 3px; }
+"""
+
+# 报告脚本（内联到 <script> 中，或作为共享资源单独发布）
+REPORT_JS = """        function copyTable() {
+            const table = document.getElementById('authorTable');
+            let text = '# 贡献者排行榜\\n\\n';
+            const rows = table.querySelectorAll('tbody tr');
+            rows.forEach(row => {
+                const cells = row.querySelectorAll('td');
+                text += `${cells[0].textContent} | ${cells[1].textContent} | ${cells[2].textContent} commits | +${cells[3].textContent} | -${cells[4].textContent}\\n`;
+            });
+            navigator.clipboard.writeText(text).then(() => {
+                alert('✅ 数据已复制到剪贴板！');
+            });
+        }
+        
+        // 时间线：倒排索引筛选 + 虚拟列表（只渲染可见窗口）
+        // 位置（position）指提交在"最新优先"序列中的下标
+        const TIMELINE_ROW_HEIGHT = 76;
+        const TIMELINE_OVERSCAN = 5;
+        const FILTER_DEBOUNCE_MS = 150;
+        const CJK_CHARS = '\\u3400-\\u9fff\\uf900-\\ufaff';
+        const QUERY_TOKEN = new RegExp(`[${CJK_CHARS}]+|(?:(?![${CJK_CHARS}])[\\\\p{L}\\\\p{N}_])+`, 'gu');
+        const CJK_RUN = new RegExp(`^[${CJK_CHARS}]`, 'u');
+        let timelineItems = [];   // 内联模式：页面中的提交节点
+        let shardManifest = null; // 分片模式：分片清单
+        let shardBase = '';
+        let shardOffsets = [];    // 各分片的起始位置
+        let shardData = [];       // 已加载的分片
+        let shardRequests = [];   // 加载中的分片请求
+        let searchIndex = null;
+        let searchIndexRequest = null;
+        let timelineTotal = 0;
+        let termLookup = new Map();
+        let decodedPostings = new Map();
+        let timelineView = null;  // 筛选结果（位置列表），null 表示未筛选
+        let timelineAscending = false;
+        let filterTimer = null;
+        let renderPending = false;
+        
+        async function initTimeline() {
+            const timeline = document.getElementById('timelineList');
+            const shardUrl = timeline.dataset.shards;
+            if (shardUrl) {
+                shardBase = shardUrl.slice(0, shardUrl.lastIndexOf('/') + 1);
+                shardManifest = await (await fetch(shardUrl)).json();
+                let offset = 0;
+                shardOffsets = shardManifest.shards.map(shard => {
+                    const start = offset;
+                    offset += shard.count;
+                    return start;
+                });
+                // 搜索索引随历史增长，首次筛选时才加载；未筛选的视图只需清单中的提交总数
+                timelineTotal = shardManifest.total;
+            } else {
+                timelineItems = Array.from(timeline.querySelectorAll('.timeline-item'));
+                setSearchIndex(JSON.parse(document.getElementById('timelineIndex').textContent));
+                timelineTotal = searchIndex.total;
+            }
+            timeline.classList.add('virtual');
+            document.querySelector('.timeline-container').addEventListener('scroll', () => {
+                if (renderPending) return;
+                renderPending = true;
+                requestAnimationFrame(() => {
+                    renderPending = false;
+                    renderTimelineWindow();
+                });
+            });
+            filterTimeline();
+        }
+        
+        function setSearchIndex(index) {
+            searchIndex = index;
+            searchIndex.terms.forEach((term, i) => termLookup.set(term, i));
+        }
+        
+        function loadSearchIndex() {
+            if (!searchIndexRequest) {
+                searchIndexRequest = fetch(shardBase + shardManifest.index)
+                    .then(response => response.json())
+                    .then(setSearchIndex);
+            }
+            return searchIndexRequest;
+        }
+        
+        function postings(key, deltas) {
+            // 差分解码，结果缓存
+            let list = decodedPostings.get(key);
+            if (!list) {
+                list = new Int32Array(deltas.length);
+                let value = 0;
+                for (let i = 0; i < deltas.length; i++) {
+                    value += deltas[i];
+                    list[i] = value;
+                }
+                decodedPostings.set(key, list);
+            }
+            return list;
+        }
+        
+        function termPostings(term) {
+            const i = termLookup.get(term);
+            return i === undefined ? [] : [postings('t' + i, searchIndex.postings[i])];
+        }
+        
+        function queryGroups(text) {
+            // 每组为若干倒排列表的并集，各组之间求交集
+            const groups = [];
+            for (const token of text.toLowerCase().match(QUERY_TOKEN) || []) {
+                if (CJK_RUN.test(token)) {
+                    if (token.length === 1) {
+                        groups.push(termPostings(token));
+                    } else {
+                        for (let i = 0; i < token.length - 1; i++) {
+                            groups.push(termPostings(token.slice(i, i + 2)));
+                        }
+                    }
+                } else {
+                    // 拉丁词项按子串匹配：词表远小于提交数，直接扫描
+                    const lists = [];
+                    searchIndex.terms.forEach((term, i) => {
+                        if (term.includes(token)) lists.push(postings('t' + i, searchIndex.postings[i]));
+                    });
+                    groups.push(lists);
+                }
+            }
+            return groups;
+        }
+        
+        function scheduleFilter() {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(filterTimeline, FILTER_DEBOUNCE_MS);
+        }
+        
+        function filterTimeline() {
+            const authorFilter = document.getElementById('authorFilter').value;
+            const typeFilter = document.getElementById('typeFilter').value;
+            const searchText = document.getElementById('searchText').value;
+            timelineAscending = document.getElementById('sortOrder').value === 'asc';
+            
+            const unfiltered = authorFilter === 'all' && typeFilter === 'all' && !searchText.toLowerCase().match(QUERY_TOKEN);
+            if (!searchIndex && !unfiltered) {
+                // 分片模式：加载索引后按当时的筛选条件重新筛选
+                loadSearchIndex().then(filterTimeline);
+                return;
+            }
+            
+            if (unfiltered) {
+                timelineView = null;
+            } else {
+                const groups = queryGroups(searchText);
+                if (authorFilter !== 'all') {
+                    const authorId = searchIndex.authors.indexOf(authorFilter);
+                    groups.push(authorId < 0 ? [] : [postings('a' + authorId, searchIndex.author_postings[authorId])]);
+                }
+                const merge = postings('merge', searchIndex.merge);
+                const mergeLike = postings('merge_like', searchIndex.merge_like);
+                if (typeFilter === 'merge') groups.push([merge]);
+                if (typeFilter === 'merge-like') groups.push([mergeLike]);
+                
+                // hits[p] 记录位置 p 连续命中的组数，命中全部组即为结果
+                const EXCLUDED = 0xffff;
+                const hits = new Uint16Array(timelineTotal);
+                groups.forEach((lists, k) => {
+                    for (const list of lists) {
+                        for (const p of list) {
+                            if (hits[p] === k) hits[p] = k + 1;
+                        }
+                    }
+                });
+                if (typeFilter === 'normal') {
+                    for (const p of merge) hits[p] = EXCLUDED;
+                    for (const p of mergeLike) hits[p] = EXCLUDED;
+                }
+                const view = [];
+                for (let p = 0; p < hits.length; p++) {
+                    if (hits[p] === groups.length) view.push(p);
+                }
+                timelineView = view;
+            }
+            document.querySelector('.timeline-container').scrollTop = 0;
+            renderTimelineWindow();
+        }
+        
+        function loadShard(k) {
+            if (!shardRequests[k]) {
+                shardRequests[k] = fetch(shardBase + shardManifest.shards[k].file)
+                    .then(response => response.json())
+                    .then(data => { shardData[k] = data; return data; });
+            }
+            return shardRequests[k];
+        }
+        
+        function locateCommit(position) {
+            // 二分查找所在分片
+            let lo = 0, hi = shardOffsets.length - 1;
+            while (lo < hi) {
+                const mid = (lo + hi + 1) >> 1;
+                if (shardOffsets[mid] <= position) lo = mid; else hi = mid - 1;
+            }
+            return [lo, position - shardOffsets[lo]];
+        }
+        
+        function timelineLength() {
+            return timelineView ? timelineView.length : timelineTotal;
+        }
+        
+        function timelinePosition(i) {
+            const j = timelineAscending ? timelineLength() - 1 - i : i;
+            return timelineView ? timelineView[j] : j;
+        }
+        
+        function createTimelineItem(shard, row) {
+            const flag = shard.m[row];
+            const author = shard.a[row];
+            const color = shardManifest.colors[author];
+            const item = document.createElement('div');
+            item.className = 'timeline-item' + (flag === 1 ? ' merge' : flag === 2 ? ' merge-like' : '');
+            item.style.borderLeft = `3px solid ${color}`;
+            const date = document.createElement('div');
+            date.className = 'timeline-date';
+            // 时间戳已按本地时区偏移，直接按 UTC 格式化
+            date.textContent = new Date(shard.t[row] * 1000).toISOString().slice(0, 16).replace('T', ' ');
+            const name = document.createElement('div');
+            name.className = 'timeline-author';
+            name.style.color = color;
+            name.textContent = shardManifest.authors[author];
+            const subject = document.createElement('div');
+            subject.className = 'timeline-subject';
+            subject.textContent = shard.s[row];
+            subject.title = shard.s[row];
+            item.append(date, name, subject);
+            return item;
+        }
+        
+        function renderTimelineWindow() {
+            const container = document.querySelector('.timeline-container');
+            const timeline = document.getElementById('timelineList');
+            const total = timelineLength();
+            timeline.style.height = `${total * TIMELINE_ROW_HEIGHT}px`;
+            const first = Math.max(0, Math.floor(container.scrollTop / TIMELINE_ROW_HEIGHT) - TIMELINE_OVERSCAN);
+            const last = Math.min(total, Math.ceil((container.scrollTop + container.clientHeight) / TIMELINE_ROW_HEIGHT) + TIMELINE_OVERSCAN);
+            const items = [];
+            const missing = new Set();
+            for (let i = first; i < last; i++) {
+                const position = timelinePosition(i);
+                let item;
+                if (shardManifest) {
+                    const [k, row] = locateCommit(position);
+                    if (!shardData[k]) {
+                        missing.add(k);
+                        continue;
+                    }
+                    item = createTimelineItem(shardData[k], row);
+                } else {
+                    item = timelineItems[position];
+                }
+                item.style.top = `${i * TIMELINE_ROW_HEIGHT}px`;
+                items.push(item);
+            }
+            timeline.replaceChildren(...items);
+            if (missing.size) {
+                Promise.all([...missing].map(loadShard)).then(renderTimelineWindow);
+            }
+        }
+        
+        // 图表：根据 chartData 绘制 SVG 条形图（条形宽度随容器变化，窗口缩放时重绘）
+        const SVG_NS = 'http://www.w3.org/2000/svg';
+        const BAR_HEIGHT = 20;
+        const BAR_GAP = 6;
+        const BAR_MIN_WIDTH = 30;
+        const BAR_LABEL_MIN_WIDTH = 70;
+        const WEEKDAY_NAMES = ['周一', '周二', '周三', '周四', '周五', '周六', '周日'];
+        const CHART_LABELS = {
+            hour: i => `${String(i).padStart(2, '0')}:00`,
+            weekday: i => WEEKDAY_NAMES[i],
+        };
+        let chartData = {};
+        let chartResizeTimer = null;
+        
+        function chartSeries(name) {
+            // 统一为 {labels, values, texts, max}；纯数组的标签由 CHART_LABELS 生成
+            const data = chartData[name];
+            const series = Array.isArray(data)
+                ? {values: data, labels: data.map((_, i) => CHART_LABELS[name](i))}
+                : Object.assign({}, data);
+            series.texts = series.texts || series.values.map(value => value > 0 ? String(value) : '');
+            series.max = series.max || Math.max(0, ...series.values);
+            return series;
+        }
+        
+        function svgElement(tag, attrs, text) {
+            const el = document.createElementNS(SVG_NS, tag);
+            for (const key in attrs) el.setAttribute(key, attrs[key]);
+            if (text !== undefined) el.textContent = text;
+            return el;
+        }
+        
+        function renderBarChart(container, name) {
+            const series = chartSeries(name);
+            const rowHeight = BAR_HEIGHT + BAR_GAP;
+            const svg = svgElement('svg', {height: Math.max(series.values.length * rowHeight - BAR_GAP, 0)});
+            const gradient = svgElement('linearGradient', {id: `barGradient-${name}`});
+            gradient.appendChild(svgElement('stop', {offset: '0', class: 'bar-gradient-start'}));
+            gradient.appendChild(svgElement('stop', {offset: '1', class: 'bar-gradient-end'}));
+            svg.appendChild(svgElement('defs', {})).appendChild(gradient);
+            container.replaceChildren(svg);
+            
+            // 标签列宽取最长标签（至少 70px），其余为条形轨道
+            const labels = series.labels.map((label, i) => svg.appendChild(svgElement('text', {
+                class: 'bar-label', x: 0, y: i * rowHeight + BAR_HEIGHT / 2, 'dominant-baseline': 'central'
+            }, label)));
+            const labelWidth = Math.max(BAR_LABEL_MIN_WIDTH, ...labels.map(label => label.getComputedTextLength())) + 12;
+            const trackWidth = Math.max(container.clientWidth - labelWidth, BAR_MIN_WIDTH);
+            series.values.forEach((value, i) => {
+                const y = i * rowHeight;
+                const width = Math.max(series.max > 0 ? value / series.max * trackWidth : 0, BAR_MIN_WIDTH);
+                svg.appendChild(svgElement('rect', {
+                    class: 'bar-track', x: labelWidth, y, width: trackWidth, height: BAR_HEIGHT, rx: BAR_HEIGHT / 2
+                }));
+                svg.appendChild(svgElement('rect', {
+                    x: labelWidth, y, width, height: BAR_HEIGHT, rx: BAR_HEIGHT / 2, fill: `url(#barGradient-${name})`
+                }));
+                svg.appendChild(svgElement('text', {
+                    class: 'bar-text', x: labelWidth + width - 8, y: y + BAR_HEIGHT / 2,
+                    'text-anchor': 'end', 'dominant-baseline': 'central'
+                }, series.texts[i]));
+            });
+        }
+        
+        // 热力图：7 行（星期）× 24 列（小时），颜色深浅按最大值归一
+        const HEATMAP_LABEL_WIDTH = 36;
+        const HEATMAP_HEADER_HEIGHT = 16;
+        const HEATMAP_CELL_HEIGHT = 16;
+        const HEATMAP_GAP = 2;
+        
+        function heatmapCells(author) {
+            const heatmap = chartData.heatmap;
+            const i = heatmap.authors.indexOf(author);
+            if (i < 0) return heatmap.cells;
+            // 单个成员：第 d 天 h 时 ≈ 该小时提交数 × 该星期提交数 / 总提交数
+            const hours = heatmap.hours[i];
+            const weekdays = heatmap.weekdays[i];
+            const total = hours.reduce((sum, count) => sum + count, 0);
+            const cells = new Array(168).fill(0);
+            if (total > 0) {
+                for (let d = 0; d < 7; d++) {
+                    for (let h = 0; h < 24; h++) cells[d * 24 + h] = hours[h] * weekdays[d] / total;
+                }
+            }
+            return cells;
+        }
+        
+        function renderHeatmap() {
+            const container = document.getElementById('heatmapChart');
+            if (!chartData.heatmap) return;
+            const author = document.getElementById('heatmapAuthor').value;
+            const cells = heatmapCells(author);
+            const max = Math.max(0, ...cells);
+            const cellWidth = Math.max((container.clientWidth - HEATMAP_LABEL_WIDTH) / 24 - HEATMAP_GAP, 4);
+            const rowHeight = HEATMAP_CELL_HEIGHT + HEATMAP_GAP;
+            const svg = svgElement('svg', {height: HEATMAP_HEADER_HEIGHT + 7 * rowHeight - HEATMAP_GAP});
+            for (let h = 0; h < 24; h += 3) {
+                svg.appendChild(svgElement('text', {
+                    class: 'bar-label', x: HEATMAP_LABEL_WIDTH + h * (cellWidth + HEATMAP_GAP), y: HEATMAP_HEADER_HEIGHT - 4
+                }, String(h).padStart(2, '0')));
+            }
+            WEEKDAY_NAMES.forEach((name, d) => {
+                const y = HEATMAP_HEADER_HEIGHT + d * rowHeight;
+                svg.appendChild(svgElement('text', {
+                    class: 'bar-label', x: 0, y: y + HEATMAP_CELL_HEIGHT / 2, 'dominant-baseline': 'central'
+                }, name));
+                for (let h = 0; h < 24; h++) {
+                    const value = cells[d * 24 + h];
+                    const cell = svgElement('rect', {
+                        class: value > 0 ? 'heatmap-cell' : 'heatmap-cell empty',
+                        x: HEATMAP_LABEL_WIDTH + h * (cellWidth + HEATMAP_GAP), y,
+                        width: cellWidth, height: HEATMAP_CELL_HEIGHT, rx: 3,
+                        'fill-opacity': value > 0 ? (0.15 + 0.85 * value / max).toFixed(3) : 1
+                    });
+                    const count = author ? `约 ${value.toFixed(1)}` : value;
+                    cell.appendChild(svgElement('title', {}, `${name} ${String(h).padStart(2, '0')}:00 · ${count} 次提交`));
+                    svg.appendChild(cell);
+                }
+            });
+            container.replaceChildren(svg);
+        }
+        
+        // 提交日历：每年一块，列为周、行为星期（周一在上），颜色按最大日提交数分 4 级
+        const CALENDAR_GAP = 2;
+        const CALENDAR_HEADER_HEIGHT = 14;
+        const CALENDAR_YEAR_GAP = 10;
+        const DAY_MS = 86400000;
+        
+        function decodeDayCounts(stream) {
+            // [间隔, 提交数, ...] → Map(自 1970-01-01 起的天数 → 提交数)
+            const days = new Map();
+            let day = 0;
+            for (let i = 0; i < stream.length; i += 2) {
+                day += stream[i];
+                days.set(day, stream[i + 1]);
+            }
+            return days;
+        }
+        
+        function renderCalendar() {
+            const container = document.getElementById('calendarChart');
+            if (!chartData.calendar) return;
+            const i = chartData.heatmap.authors.indexOf(document.getElementById('calendarAuthor').value);
+            const days = decodeDayCounts(i < 0 ? chartData.calendar.all : chartData.calendar.authors[i]);
+            if (!days.size) {
+                container.replaceChildren();
+                return;
+            }
+            const max = Math.max(...days.values());
+            const firstYear = new Date(Math.min(...days.keys()) * DAY_MS).getUTCFullYear();
+            const lastYear = new Date(Math.max(...days.keys()) * DAY_MS).getUTCFullYear();
+            const size = Math.max((container.clientWidth - HEATMAP_LABEL_WIDTH) / 54 - CALENDAR_GAP, 4);
+            const step = size + CALENDAR_GAP;
+            const yearHeight = CALENDAR_HEADER_HEIGHT + 7 * step - CALENDAR_GAP;
+            const svg = svgElement('svg', {
+                height: (lastYear - firstYear + 1) * (yearHeight + CALENDAR_YEAR_GAP) - CALENDAR_YEAR_GAP
+            });
+            
+            // 最新的年份在上
+            for (let year = lastYear; year >= firstYear; year--) {
+                const top = (lastYear - year) * (yearHeight + CALENDAR_YEAR_GAP);
+                const start = Date.UTC(year, 0, 1) / DAY_MS;
+                const end = Date.UTC(year + 1, 0, 1) / DAY_MS;
+                const offset = (start + 3) % 7;  // 1970-01-01 是星期四
+                svg.appendChild(svgElement('text', {
+                    class: 'bar-label', x: 0, y: top + CALENDAR_HEADER_HEIGHT + size / 2, 'dominant-baseline': 'central'
+                }, String(year)));
+                for (let month = 0; month < 12; month++) {
+                    const column = Math.floor((Date.UTC(year, month, 1) / DAY_MS - start + offset) / 7);
+                    svg.appendChild(svgElement('text', {
+                        class: 'bar-label', x: HEATMAP_LABEL_WIDTH + column * step, y: top + CALENDAR_HEADER_HEIGHT - 4
+                    }, `${month + 1}月`));
+                }
+                for (let day = start; day < end; day++) {
+                    const count = days.get(day) || 0;
+                    const cell = svgElement('rect', {
+                        class: count > 0 ? 'heatmap-cell' : 'heatmap-cell empty',
+                        x: HEATMAP_LABEL_WIDTH + Math.floor((day - start + offset) / 7) * step,
+                        y: top + CALENDAR_HEADER_HEIGHT + (day + 3) % 7 * step,
+                        width: size, height: size, rx: 2,
+                        'fill-opacity': count > 0 ? Math.ceil(count / max * 4) / 4 : 1
+                    });
+                    const date = new Date(day * DAY_MS).toISOString().slice(0, 10);
+                    cell.appendChild(svgElement('title', {}, `${date} · ${count} 次提交`));
+                    svg.appendChild(cell);
+                }
+            }
+            container.replaceChildren(svg);
+        }
+        
+        function renderCharts() {
+            document.querySelectorAll('.bar-chart[data-chart]').forEach(container => {
+                if (chartData[container.dataset.chart]) renderBarChart(container, container.dataset.chart);
+            });
+            renderHeatmap();
+            renderCalendar();
+        }
+        
+        function initCharts() {
+            chartData = JSON.parse(document.getElementById('chartData').textContent);
+            if (chartData.heatmap) {
+                ['heatmapAuthor', 'calendarAuthor'].forEach(id => {
+                    const select = document.getElementById(id);
+                    chartData.heatmap.authors.forEach(author => {
+                        const option = document.createElement('option');
+                        option.value = author;
+                        option.textContent = author;
+                        select.appendChild(option);
+                    });
+                });
+            }
+            renderCharts();
+            window.addEventListener('resize', () => {
+                clearTimeout(chartResizeTimer);
+                chartResizeTimer = setTimeout(renderCharts, 100);
+            });
+        }
+        
+        // 加载动画
+        document.addEventListener('DOMContentLoaded', function() {
+            const rows = document.querySelectorAll('.data-table tbody tr');
+            rows.forEach((row, i) => {
+                row.style.opacity = '0';
+                row.style.transform = 'translateY(10px)';
+                setTimeout(() => {
+                    row.style.transition = 'all 0.3s ease';
+                    row.style.opacity = '1';
+                    row.style.transform = 'translateY(0)';
+                }, i * 50);
+            });
+            
+            // 绘制图表、初始化时间线
+            initCharts();
+            initTimeline();
+        });
+"""
+
+COMPACT_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ repo_name }} - 禾盈慧项目统计</title>
+{{ styles }}
 </head>
 <body>
     <div class="container">
         <div class="header">
             <div>
                 <div class="brand">禾盈慧 • HEYINGHUI</div>
-                <h1>{repo_name}</h1>
-                <div class="subtitle">Git 协作统计分析 · {generated_time}</div>
+                <h1>{{ repo_name }}</h1>
+                <div class="subtitle">Git 协作统计分析 · {{ generated_time }}</div>
             </div>
         </div>
         
@@ -304,22 +803,22 @@ def get_compact_html_template():
             <div class="stat-card">
                 <div class="icon">📝</div>
                 <div class="label">总提交数</div>
-                <div class="value">{total_commits}</div>
+                <div class="value">{{ total_commits }}</div>
             </div>
             <div class="stat-card">
                 <div class="icon">👥</div>
                 <div class="label">贡献者</div>
-                <div class="value">{total_authors}</div>
+                <div class="value">{{ total_authors }}</div>
             </div>
             <div class="stat-card">
                 <div class="icon">📁</div>
                 <div class="label">文件总数</div>
-                <div class="value">{total_files}</div>
+                <div class="value">{{ total_files }}</div>
             </div>
             <div class="stat-card">
                 <div class="icon">✨</div>
                 <div class="label">代码变更</div>
-                <div class="value">{total_additions:,}</div>
+                <div class="value">{{ total_additions:, }}</div>
             </div>
         </div>
         
@@ -343,15 +842,15 @@ def get_compact_html_template():
                             <th>贡献者</th>
                             <th style="width: 80px;">提交数</th>
                             <th style="width: 90px;">新增行</th>
-                            <th style="width: 90px;">删除行</th>
-                            <th style="width: 80px;">文件数</th>
+                            <th style="width: 90px;">删除行</th>{{ ownership_header }}
+                            <th style="width: 80px;">{{ files_column_label }}</th>
                             <th style="width: 100px;">代码当量</th>
                             <th style="width: 100px;">首次提交</th>
                             <th style="width: 100px;">最近提交</th>
                         </tr>
                     </thead>
                     <tbody>
-{authors_rows}
+{{ authors_rows }}
                     </tbody>
                 </table>
             </div>
@@ -361,14 +860,14 @@ def get_compact_html_template():
                 <div class="section-header">
                     <span class="icon">📅</span>
                     <h2>完整提交时间线</h2>
-                    <span style="font-size: 11px; color: #6b7280;">共 {total_commits} 次提交 · 支持筛选排序 · <span style="color: var(--success);">●</span> = Merge</span>
+                    <span style="font-size: 11px; color: #6b7280;">共 {{ total_commits }} 次提交 · 支持筛选排序 · <span style="color: var(--success);">●</span> = Merge</span>
                 </div>
                 <div class="filter-controls">
                     <label>
                         贡献者:
                         <select id="authorFilter" onchange="filterTimeline()">
                             <option value="all">全部</option>
-{author_options}
+{{ author_options }}
                         </select>
                     </label>
                     <label>
@@ -377,6 +876,7 @@ def get_compact_html_template():
                             <option value="all">全部</option>
                             <option value="normal">普通提交</option>
                             <option value="merge">合并提交</option>
+                            <option value="merge-like">类合并提交</option>
                         </select>
                     </label>
                     <label>
@@ -388,14 +888,15 @@ def get_compact_html_template():
                     </label>
                     <label>
                         搜索:
-                        <input type="text" id="searchText" placeholder="搜索提交信息..." oninput="filterTimeline()" style="width: 200px;">
+                        <input type="text" id="searchText" placeholder="搜索提交信息..." oninput="scheduleFilter()" style="width: 200px;">
                     </label>
                 </div>
                 <div class="timeline-container">
-                    <div class="timeline" id="timelineList">
-{timeline_items}
+                    <div class="timeline" id="timelineList"{{ timeline_attrs }}>
+{{ timeline_items }}
                     </div>
                 </div>
+                <script type="application/json" id="timelineIndex">{{ timeline_index }}</script>
             </div>
             
             <!-- 活跃时段分析 - 2栏并列 -->
@@ -407,16 +908,24 @@ def get_compact_html_template():
                 <div class="chart-grid">
                     <div class="chart-box">
                         <div class="chart-title">按小时分布</div>
-                        <div class="bar-chart">
-{hour_bars}
-                        </div>
+                        <div class="bar-chart" data-chart="hour"></div>
                     </div>
                     <div class="chart-box">
                         <div class="chart-title">按星期分布</div>
-                        <div class="bar-chart">
-{weekday_bars}
+                        <div class="bar-chart" data-chart="weekday"></div>
+                    </div>
+                </div>
+                <div class="chart-box">
+                    <div class="heatmap-header">
+                        <div class="chart-title">提交热力图（星期 × 小时）</div>
+                        <div class="filter-controls">
+                            <select id="heatmapAuthor" onchange="renderHeatmap()">
+                                <option value="">全部成员</option>
+                            </select>
                         </div>
                     </div>
+                    <div class="heatmap" id="heatmapChart"></div>
+                    <div class="heatmap-note">单个成员的热力图由其按小时、按星期的提交数估算（两者视为相互独立）</div>
                 </div>
             </div>
             
@@ -429,98 +938,84 @@ def get_compact_html_template():
                 <div class="chart-grid">
                     <div class="chart-box">
                         <div class="chart-title">Top 10 文件类型</div>
-                        <div class="bar-chart">
-{filetype_bars}
-                        </div>
+                        <div class="bar-chart" data-chart="filetype"></div>
                     </div>
                     <div class="chart-box">
                         <div class="chart-title">最近12个月提交趋势</div>
-                        <div class="bar-chart">
-{month_bars}
+                        <div class="bar-chart" data-chart="month"></div>
+                    </div>{{ loc_chart }}
+                </div>
+                <div class="chart-box">
+                    <div class="heatmap-header">
+                        <div class="chart-title">提交日历（全部历史）</div>
+                        <div class="filter-controls">
+                            <select id="calendarAuthor" onchange="renderCalendar()">
+                                <option value="">全部成员</option>
+                            </select>
                         </div>
                     </div>
+                    <div class="heatmap" id="calendarChart"></div>
+                </div>
+                <script type="application/json" id="chartData">{{ chart_data }}</script>
+            </div>
+            
+            <!-- 代码热点 - 2栏并列 -->
+            <div class="section">
+                <div class="section-header">
+                    <span class="icon">🔥</span>
+                    <h2>代码热点</h2>
+                    <span style="font-size: 11px; color: #6b7280;">按变更行数（新增+删除）排序 · Top {{ hotspot_limit }}</span>
+                </div>
+                <div class="chart-grid">
+                    <div class="chart-box">
+                        <div class="chart-title">热点文件</div>
+                        <table class="data-table">
+                            <thead>
+                                <tr>
+                                    <th style="width: 30px;">#</th>
+                                    <th>文件</th>
+                                    <th style="width: 60px;">修改次数</th>
+                                    <th style="width: 70px;">变更行数</th>
+                                    <th style="width: 50px;">作者数</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+{{ hotspot_file_rows }}
+                            </tbody>
+                        </table>
+                    </div>
+                    <div class="chart-box">
+                        <div class="chart-title">热点目录</div>
+                        <table class="data-table">
+                            <thead>
+                                <tr>
+                                    <th style="width: 30px;">#</th>
+                                    <th>目录</th>
+                                    <th style="width: 60px;">修改次数</th>
+                                    <th style="width: 70px;">变更行数</th>
+                                    <th style="width: 50px;">作者数</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+{{ hotspot_dir_rows }}
+                            </tbody>
+                        </table>
+                    </div>
                 </div>
             </div>
         </div>
     </div>
     
-    <script>
-        function copyTable() {{
-            const table = document.getElementById('authorTable');
-            let text = '# 贡献者排行榜\\n\\n';
-            const rows = table.querySelectorAll('tbody tr');
-            rows.forEach(row => {{
-                const cells = row.querySelectorAll('td');
-                text += `${{cells[0].textContent}} | ${{cells[1].textContent}} | ${{cells[2].textContent}} commits | +${{cells[3].textContent}} | -${{cells[4].textContent}}\\n`;
-            }});
-            navigator.clipboard.writeText(text).then(() => {{
-                alert('✅ 数据已复制到剪贴板！');
-            }});
-        }}
-        
-        // 时间线筛选排序
-        let allTimelineItems = [];
-        
-        function initTimeline() {{
-            const items = document.querySelectorAll('.timeline-item');
-            items.forEach(item => {{
-                allTimelineItems.push({{
-                    element: item.cloneNode(true),
-                    author: item.querySelector('.timeline-author').textContent,
-                    subject: item.querySelector('.timeline-subject').textContent,
-                    date: item.querySelector('.timeline-date').textContent,
-                    isMerge: item.classList.contains('merge'),
-                    timestamp: item.querySelector('.timeline-date').textContent
-                }});
-            }});
-        }}
-        
-        function filterTimeline() {{
-            const authorFilter = document.getElementById('authorFilter').value;
-            const typeFilter = document.getElementById('typeFilter').value;
-            const sortOrder = document.getElementById('sortOrder').value;
-            const searchText = document.getElementById('searchText').value.toLowerCase();
-            
-            let filtered = allTimelineItems.filter(item => {{
-                // 作者筛选
-                if (authorFilter !== 'all' && item.author !== authorFilter) return false;
-                // 类型筛选
-                if (typeFilter === 'merge' && !item.isMerge) return false;
-                if (typeFilter === 'normal' && item.isMerge) return false;
-                // 搜索筛选
-                if (searchText && !item.subject.toLowerCase().includes(searchText)) return false;
-                return true;
-            }});
-            
-            // 排序
-            if (sortOrder === 'asc') {{
-                filtered.reverse();
-            }}
-            
-            // 更新显示
-            const timeline = document.getElementById('timelineList');
-            timeline.innerHTML = '';
-            filtered.forEach(item => {{
-                timeline.appendChild(item.element.cloneNode(true));
-            }});
-        }}
-        
-        // 加载动画
-        document.addEventListener('DOMContentLoaded', function() {{
-            const rows = document.querySelectorAll('.data-table tbody tr');
-            rows.forEach((row, i) => {{
-                row.style.opacity = '0';
-                row.style.transform = 'translateY(10px)';
-                setTimeout(() => {{
-                    row.style.transition = 'all 0.3s ease';
-                    row.style.opacity = '1';
-                    row.style.transform = 'translateY(0)';
-                }}, i * 50);
-            }});
-            
-            // 初始化时间线
-            initTimeline();
-        }});
-    </script>
+{{ scripts }}
 </body>
 </html>"""
+
+
+def get_compact_html_template():
+    """返回紧凑型HTML模板字符串"""
+    return COMPACT_HTML_TEMPLATE
+
+
+def get_report_assets():
+    """返回报告页面的样式与脚本 (css, js)"""
+    return REPORT_CSS, REPORT_JS
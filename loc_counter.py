@@ -0,0 +1,119 @@
+"""
+代码行数 - 按扩展名统计 HEAD 中的代码行数
+
+所有 blob 通过长驻的 git cat-file --batch 进程流式读取（每个工作线程一个进程），
+逐块统计换行符；结果以 blob SHA 为键缓存，文件内容未变化时不会重复读取。
+"""
+
+import os
+import subprocess
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from stats_cache import load_json, save_json
+from file_inventory import file_extension, list_head_blobs, is_binary, retain_current
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def count_blob_lines(repo_path, shas):
+    """用一个 git cat-file --batch 进程依次读取多个 blob，返回 {SHA: 行数}
+
+    二进制文件记为 -1，以便缓存时与空文件区分。
+    """
+    proc = subprocess.Popen(
+        ['git', 'cat-file', '--batch'],
+        cwd=repo_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+
+    # 另起线程写入请求，避免管道缓冲区写满时与读取互相阻塞
+    def feed():
+        try:
+            for sha in shas:
+                proc.stdin.write(sha.encode('ascii') + b'\n')
+        except BrokenPipeError:
+            pass
+        finally:
+            proc.stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+
+    results = {}
+    stdout = proc.stdout
+    for sha in shas:
+        # 响应头: "<SHA> <类型> <大小>\n"，随后是内容和一个换行符
+        header = stdout.readline().split()
+        if len(header) != 3:
+            # "<SHA> missing" 等异常情况
+            results[sha] = 0
+            continue
+        remaining = int(header[2])
+        lines = 0
+        binary = False
+        last = b'\n'
+        first = True
+        while remaining:
+            chunk = stdout.read(min(remaining, READ_CHUNK_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if first and is_binary(chunk):
+                binary = True
+            first = False
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+        stdout.read(1)
+        if binary:
+            results[sha] = -1
+        else:
+            # 最后一行没有换行符时也计为一行
+            results[sha] = lines + (last != b'\n')
+
+    writer.join()
+    proc.wait()
+    return results
+
+
+def count_lines_parallel(repo_path, shas, jobs):
+    """按工作线程数均分 blob，每个线程独占一个 cat-file 进程，返回 {SHA: 行数}（二进制为 -1）"""
+    results = {}
+    if not shas:
+        return results
+    jobs = min(jobs, len(shas))
+    batches = [shas[i::jobs] for i in range(jobs)]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for result in executor.map(lambda batch: count_blob_lines(repo_path, batch), batches):
+            results.update(result)
+    return results
+
+
+class LocCounter:
+    """HEAD 中各扩展名的代码行数"""
+
+    def __init__(self, repo_path, cache_dir, jobs=None):
+        self.repo_path = repo_path
+        self.cache_path = os.path.join(cache_dir, 'loc-cache.json')
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def compute(self):
+        """返回 {扩展名: 行数}（不含二进制文件）"""
+        blobs = list_head_blobs(self.repo_path)
+        cache = load_json(self.cache_path) or {}
+        missing = sorted({sha for sha, _ in blobs if sha not in cache})
+        print(f"   代码行数: {len(blobs) - len(missing)} 个文件命中缓存, {len(missing)} 个文件需要读取")
+
+        cache.update(count_lines_parallel(self.repo_path, missing, self.jobs))
+        cache = retain_current(cache, {sha for sha, _ in blobs})
+        save_json(self.cache_path, cache)
+
+        totals = defaultdict(int)
+        for sha, path in blobs:
+            lines = cache[sha]
+            if lines >= 0:
+                totals[file_extension(path)] += lines
+        return totals
@@ -0,0 +1,90 @@
+"""
+代码归属 - 基于 git blame 统计每位作者在当前代码中存活的行数
+
+blame 结果与路径和历史有关，以 (路径, blob SHA) 为键缓存：同一内容出现在多个路径时各自 blame，
+文件内容未变化时不会重复 blame；
+未命中缓存的文件先经批量 cat-file 读取排除二进制与空文件（与代码行数统计共用），
+其余由一组并发的 git blame 进程处理。
+"""
+
+import os
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from stats_cache import load_json, save_json
+from file_inventory import list_head_blobs, retain_current
+from loc_counter import count_lines_parallel
+
+
+def blame_file(repo_path, path):
+    """对 HEAD 中的单个文本文件执行 blame，返回 [[作者名, 邮箱, 行数], ...]"""
+    result = subprocess.run(
+        ['git', 'blame', '--incremental', '--porcelain', 'HEAD', '--', path],
+        cwd=repo_path,
+        capture_output=True
+    )
+    if result.returncode != 0:
+        return []
+
+    # --incremental 输出：每组以 "<sha> <原行号> <现行号> <行数>" 开头，
+    # 提交的作者信息只在该提交第一次出现时给出
+    lines_by_commit = defaultdict(int)
+    authors = {}
+    current = None
+    for line in result.stdout.decode('utf-8', 'replace').split('\n'):
+        parts = line.split(' ')
+        if len(parts) == 4 and len(parts[0]) == 40 and parts[3].isdigit():
+            current = parts[0]
+            lines_by_commit[current] += int(parts[3])
+        elif line.startswith('author ') and current:
+            authors.setdefault(current, ['', ''])[0] = line[7:]
+        elif line.startswith('author-mail ') and current:
+            authors.setdefault(current, ['', ''])[1] = line[12:].strip('<>')
+
+    counts = defaultdict(int)
+    for commit, lines in lines_by_commit.items():
+        name, email = authors.get(commit, ['', ''])
+        counts[(name, email)] += lines
+    return [[name, email, lines] for (name, email), lines in counts.items()]
+
+
+def cache_key(blob_sha, path):
+    # SHA 定长，以 ":" 拼接后仍可无歧义地区分
+    return f'{blob_sha}:{path}'
+
+
+class OwnershipEngine:
+    """统计 HEAD 中每位作者存活的代码行数"""
+
+    def __init__(self, repo_path, cache_dir, jobs=None):
+        self.repo_path = repo_path
+        self.cache_path = os.path.join(cache_dir, 'blame-cache.json')
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def compute(self):
+        """返回 {(作者名, 邮箱): 存活行数}"""
+        blobs = list_head_blobs(self.repo_path)
+        cache = load_json(self.cache_path) or {}
+        missing = [(sha, path) for sha, path in blobs if cache_key(sha, path) not in cache]
+        print(f"   代码归属: {len(blobs) - len(missing)} 个文件命中缓存, {len(missing)} 个文件需要 blame")
+
+        if missing:
+            # 二进制文件（-1）与空文件没有可归属的行，不必 blame
+            line_counts = count_lines_parallel(self.repo_path, sorted({sha for sha, _ in missing}), self.jobs)
+            to_blame = [(sha, path) for sha, path in missing if line_counts.get(sha, 0) > 0]
+            for sha, path in missing:
+                cache[cache_key(sha, path)] = []
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                results = executor.map(lambda item: blame_file(self.repo_path, item[1]), to_blame)
+                for (sha, path), entries in zip(to_blame, results):
+                    cache[cache_key(sha, path)] = entries
+
+        cache = retain_current(cache, {cache_key(sha, path) for sha, path in blobs})
+        save_json(self.cache_path, cache)
+
+        totals = defaultdict(int)
+        for sha, path in blobs:
+            for name, email, lines in cache[cache_key(sha, path)]:
+                totals[(name, email)] += lines
+        return totals
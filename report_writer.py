@@ -0,0 +1,133 @@
+"""
+报告写出 - 预编译的模板与分块流式写入
+
+模板只解析一次，拆分为静态片段与具名槽位（{{ name }} / {{ name:格式 }}），
+同一次运行中生成多个仓库的报告时直接复用编译结果。
+槽位的值可以是字符串/数字，也可以是逐段产出字符串的可迭代对象（生成器）；
+后者边生成边写入文件，整页内容不会同时驻留在内存中。
+
+耗时的区块可以经 FragmentCache 缓存到磁盘：输入未变化时直接复用上次生成的片段。
+报告先写入临时文件再重命名；内容（不含生成时间等易变槽位）与上次相同时保留原文件。
+"""
+
+import os
+import re
+import glob
+import hashlib
+from functools import lru_cache
+
+from build_artifacts import minify_chunks
+from stats_cache import AtomicFile
+
+WRITE_BUFFER_SIZE = 1 << 16
+SLOT_PATTERN = re.compile(r'\{\{\s*([A-Za-z_]\w*)(?::([^}\s]*))?\s*\}\}')
+
+
+class CompiledTemplate:
+    """编译后的模板：静态片段与槽位交替排列"""
+
+    __slots__ = ('literals', 'slots', 'digest')
+
+    def __init__(self, source):
+        # literals 比 slots 多一项：literals[0] slot[0] literals[1] ... literals[-1]
+        self.literals = []
+        self.slots = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.literals.append(source[position:match.start()])
+            self.slots.append((match.group(1), match.group(2) or ''))
+            position = match.end()
+        self.literals.append(source[position:])
+        # 模板内容的摘要，用于判断缓存的区块是否仍然适用
+        self.digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+    def iter_parts(self, values):
+        """按顺序产出 (槽位名, 内容)，静态片段的槽位名为 None"""
+        for literal, (name, spec) in zip(self.literals, self.slots):
+            if literal:
+                yield None, literal
+            value = values[name]
+            if isinstance(value, (str, int, float)):
+                yield name, format(value, spec) if spec else str(value)
+            else:
+                for chunk in value:
+                    yield name, chunk
+        if self.literals[-1]:
+            yield None, self.literals[-1]
+
+
+@lru_cache(maxsize=None)
+def compile_template(source):
+    """编译模板（同一份模板只解析一次）"""
+    return CompiledTemplate(source)
+
+
+def write_template(path, template, values, volatile=(), previous_digest=None, minify=False):
+    """将填充后的模板分块写入 path，返回 (内容摘要, 是否写入)
+
+    摘要不包含 volatile 中的槽位；与 previous_digest 相同且原文件存在时不替换原文件。
+    """
+    compiled = compile_template(template)
+    digest = hashlib.sha1(compiled.digest.encode('ascii'))
+    digest.update(b'minify' if minify else b'')
+
+    def chunks():
+        for name, chunk in compiled.iter_parts(values):
+            if name not in volatile:
+                digest.update(chunk.encode('utf-8'))
+            yield chunk
+
+    with AtomicFile(path, buffering=WRITE_BUFFER_SIZE) as f:
+        for chunk in minify_chunks(chunks()) if minify else chunks():
+            f.write(chunk)
+        content_digest = digest.hexdigest()
+        written = content_digest != previous_digest or not os.path.exists(path)
+        if not written:
+            f.discard()
+    return content_digest, written
+
+
+class FragmentCache:
+    """区块片段缓存：按区块名与输入摘要保存渲染结果"""
+
+    def __init__(self, cache_dir):
+        self.fragment_dir = os.path.join(cache_dir, 'fragments')
+
+    @staticmethod
+    def key(*parts):
+        """由区块的各项输入计算摘要（bytes 直接参与，其余按 repr）"""
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part if isinstance(part, (bytes, bytearray, memoryview)) else repr(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:16]
+
+    def section(self, name, key, render):
+        """返回区块内容的可迭代对象
+
+        缓存命中时从片段文件分块读出；否则调用 render() 生成，
+        边产出边写入新的片段文件，并清除该区块的旧片段。
+        """
+        path = os.path.join(self.fragment_dir, f'{name}-{key}.html')
+        if os.path.exists(path):
+            return self._read(path)
+        return self._render(name, path, render)
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            while True:
+                chunk = f.read(WRITE_BUFFER_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _render(self, name, path, render):
+        # 未读完就停止（生成器被关闭）时丢弃临时文件，不留下不完整的片段
+        with AtomicFile(path, buffering=WRITE_BUFFER_SIZE, newline='') as f:
+            chunks = render()
+            for chunk in [chunks] if isinstance(chunks, str) else chunks:
+                f.write(chunk)
+                yield chunk
+            for stale in glob.glob(os.path.join(glob.escape(self.fragment_dir), f'{glob.escape(name)}-*.html')):
+                os.remove(stale)
@@ -0,0 +1,69 @@
+"""
+时间线搜索索引 - 预先生成的倒排索引，供页面筛选时直接求交集
+
+位置（position）指提交在"最新优先"序列中的下标，与页面中时间线的顺序一致。
+所有倒排列表按位置升序保存，并做差分编码（首项为绝对值，其后为与前一项的差）。
+
+- terms / postings: 提交信息的词项及其倒排列表
+    拉丁字母、数字按整词索引（统一小写）；中文连续片段索引单字与相邻二字（bigram）
+- authors / author_postings: 作者表及每位作者的倒排列表
+- merge / merge_like: 合并提交与类合并提交的倒排列表
+"""
+
+import re
+from collections import defaultdict
+
+from timeline_shards import SUBJECT_MAX_LENGTH
+
+CJK_CHARS = '\u3400-\u9fff\uf900-\ufaff'
+TOKEN_PATTERN = re.compile(f'[{CJK_CHARS}]+|[^\\W{CJK_CHARS}]+')
+CJK_PATTERN = re.compile(f'[{CJK_CHARS}]')
+
+
+def tokenize(text):
+    """返回提交信息中的词项集合"""
+    terms = set()
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if CJK_PATTERN.match(run):
+            terms.update(run)
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.add(run)
+    return terms
+
+
+def delta_encode(positions):
+    previous = 0
+    encoded = []
+    for position in positions:
+        encoded.append(position - previous)
+        previous = position
+    return encoded
+
+
+def build_search_index(timeline):
+    """为时间线生成可 JSON 序列化的倒排索引"""
+    postings = defaultdict(list)
+    authors = [[] for _ in timeline.authors]
+    merge = []
+    merge_like = []
+
+    for position, index in enumerate(timeline.sorted_indices(reverse=True)):
+        for term in tokenize(timeline.subject(index)[:SUBJECT_MAX_LENGTH]):
+            postings[term].append(position)
+        authors[timeline.author_ids[index]].append(position)
+        if timeline.is_merge(index):
+            merge.append(position)
+        elif timeline.is_merge_like(index):
+            merge_like.append(position)
+
+    terms = sorted(postings)
+    return {
+        'total': len(timeline),
+        'authors': timeline.authors,
+        'terms': terms,
+        'postings': [delta_encode(postings[term]) for term in terms],
+        'author_postings': [delta_encode(positions) for positions in authors],
+        'merge': delta_encode(merge),
+        'merge_like': delta_encode(merge_like),
+    }
@@ -0,0 +1,67 @@
+"""
+共享静态资源 - 以内容哈希命名的样式与脚本
+
+所有报告（及总门户）引用同一份 assets/<名称>.<哈希>.css/.js，
+内容不变则文件名不变，浏览器与 CDN 可以永久缓存；内容变化时文件名随之变化。
+"""
+
+import os
+import hashlib
+
+from stats_cache import atomic_write, ensure_file_mode
+from build_artifacts import compress_file, COMPRESSED_SUFFIXES
+
+HASH_LENGTH = 10
+
+
+def hashed_name(prefix, ext, content):
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    return f'{prefix}.{digest}.{ext}'
+
+
+def publish_asset(assets_dir, prefix, ext, content, compress=False):
+    """写出资源文件（已存在则跳过，只校正权限），返回文件名"""
+    name = hashed_name(prefix, ext, content)
+    path = os.path.join(assets_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(assets_dir, exist_ok=True)
+        atomic_write(path, content.encode('utf-8'))
+    else:
+        # 页面引用的资源须能被以其他用户运行的静态服务器读取
+        ensure_file_mode(path)
+    if compress:
+        compress_file(path)
+    return name
+
+
+def asset_url(assets_dir, output_dir, name):
+    """资源相对于页面所在目录的路径"""
+    return os.path.relpath(os.path.join(assets_dir, name), output_dir).replace(os.sep, '/')
+
+
+def style_tag(css, href=None, indent='    '):
+    """内联样式或引用共享样式表"""
+    if href:
+        return f'{indent}<link rel="stylesheet" href="{href}">'
+    return f'{indent}<style>\n{css}{indent}</style>'
+
+
+def script_tag(js, src=None, indent='    '):
+    """内联脚本或引用共享脚本"""
+    if src:
+        return f'{indent}<script src="{src}"></script>'
+    return f'{indent}<script>\n{js}{indent}</script>'
+
+
+def prune_assets(assets_dir, keep):
+    """删除本次没有页面引用的旧资源（连同其压缩文件），返回保留的文件名"""
+    if not os.path.isdir(assets_dir):
+        return []
+    for name in os.listdir(assets_dir):
+        base = name
+        for suffix in COMPRESSED_SUFFIXES:
+            if name.endswith(suffix):
+                base = name[:-len(suffix)]
+        if base not in keep:
+            os.remove(os.path.join(assets_dir, name))
+    return sorted(name for name in keep if os.path.exists(os.path.join(assets_dir, name)))
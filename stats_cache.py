@@ -0,0 +1,104 @@
+"""
+统计缓存 - 检查点与中间结果的本地持久化
+
+所有文件（缓存、报告、分片、压缩产物与共享资源）都经 AtomicFile 原子写入：
+先写入同目录下唯一命名的临时文件，再按默认权限重命名为目标文件。
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+
+# 默认缓存根目录（位于脚本目录下，不随报告发布）
+DEFAULT_CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+def repo_cache_dir(repo_path, cache_root=None):
+    """返回某个仓库专属的缓存目录（按仓库绝对路径区分）"""
+    repo_path = os.path.abspath(repo_path)
+    digest = hashlib.sha1(repo_path.encode('utf-8')).hexdigest()[:12]
+    name = os.path.basename(repo_path.rstrip(os.sep)) or 'repo'
+    return os.path.join(cache_root or DEFAULT_CACHE_ROOT, f'{name}-{digest}')
+
+
+def _default_file_mode():
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# 新文件按 umask 应有的权限（mkstemp 创建的临时文件为 0600，静态服务器以其他用户运行时无法读取）
+FILE_MODE = _default_file_mode()
+
+
+class AtomicFile:
+    """原子写入的文件：正常退出 with 块时替换目标文件，出错或调用 discard() 时丢弃
+
+    临时文件名唯一，多个进程同时写同一文件也不会互相破坏。
+    """
+
+    def __init__(self, path, mode='w', buffering=-1, newline=None):
+        self.path = path
+        self.discarded = False
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+        os.fchmod(fd, FILE_MODE)
+        encoding = None if 'b' in mode else 'utf-8'
+        self.file = os.fdopen(fd, mode, buffering=buffering, encoding=encoding, newline=newline)
+
+    def write(self, data):
+        self.file.write(data)
+
+    def discard(self):
+        """保留原文件，不替换"""
+        self.discarded = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None and not self.discarded:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+        return False
+
+
+def atomic_write(path, data):
+    """原子写入文本或字节内容"""
+    with AtomicFile(path, 'wb' if isinstance(data, (bytes, bytearray)) else 'w') as f:
+        f.write(data)
+
+
+def ensure_file_mode(path):
+    """修正以前以 0600 写出、此后被复用的文件的权限"""
+    if os.stat(path).st_mode & 0o777 != FILE_MODE:
+        os.chmod(path, FILE_MODE)
+
+
+def load_json(path):
+    """读取 JSON 缓存文件，不存在或损坏时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path, data, skip_unchanged=False):
+    """原子写入 JSON 文件，返回是否写入
+
+    skip_unchanged 时内容与现有文件逐字节相同则不写入，保留原文件（及其修改时间）。
+    """
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    if skip_unchanged:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == text:
+                    return False
+        except (OSError, ValueError):
+            pass
+    atomic_write(path, text)
+    return True
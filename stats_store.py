@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+统计数据库 - 基于 SQLite 的提交、文件变更与作者持久化存储
+
+由 GitStatsGenerator 增量写入，之后的即席查询（如"上个季度谁改过 api/"）
+直接走索引，无需重新扫描 Git 历史。
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    tips TEXT
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    sha TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    is_merge INTEGER NOT NULL,
+    subject TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_changes (
+    commit_id INTEGER NOT NULL REFERENCES commits(id),
+    path_id INTEGER NOT NULL REFERENCES paths(id),
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commits_repo_time ON commits(repo_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_commits_author_time ON commits(author_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_file_changes_path ON file_changes(path_id);
+CREATE INDEX IF NOT EXISTS idx_file_changes_commit ON file_changes(commit_id);
+"""
+
+
+class StatsStore:
+    """SQLite 统计存储，写入按批次缓冲"""
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+        self.repo_id = None
+        self._authors = {}
+        self._paths = {}
+        self._next_commit_id = None
+        self._commit_rows = []
+        self._change_rows = []
+
+    # ---- 写入 ----
+
+    def begin_repo(self, repo_path, repo_name, full_rebuild):
+        """开始写入某个仓库；全量重建时先清除该仓库已有的提交"""
+        conn = self.conn
+        conn.execute(
+            'INSERT INTO repos (path, name) VALUES (?, ?) '
+            'ON CONFLICT(path) DO UPDATE SET name = excluded.name',
+            (repo_path, repo_name)
+        )
+        self.repo_id = conn.execute('SELECT id FROM repos WHERE path = ?', (repo_path,)).fetchone()[0]
+        if full_rebuild:
+            conn.execute(
+                'DELETE FROM file_changes WHERE commit_id IN (SELECT id FROM commits WHERE repo_id = ?)',
+                (self.repo_id,)
+            )
+            conn.execute('DELETE FROM commits WHERE repo_id = ?', (self.repo_id,))
+            conn.execute('UPDATE repos SET tips = NULL WHERE id = ?', (self.repo_id,))
+        self._authors = dict(conn.execute('SELECT name, id FROM authors'))
+        self._paths = dict(conn.execute('SELECT path, id FROM paths'))
+        self._next_commit_id = (conn.execute('SELECT MAX(id) FROM commits').fetchone()[0] or 0) + 1
+
+    def repo_tips(self, repo_path):
+        """返回数据库中该仓库已同步到的引用位置（未同步过时为 None）"""
+        row = self.conn.execute('SELECT tips FROM repos WHERE path = ?', (repo_path,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def _intern(self, table, column, cache, value):
+        row_id = cache.get(value)
+        if row_id is None:
+            cursor = self.conn.execute(f'INSERT INTO {table} ({column}) VALUES (?)', (value,))
+            row_id = cache[value] = cursor.lastrowid
+        return row_id
+
+    def add_commit(self, sha, timestamp, author, subject, is_merge):
+        """记录一次提交，返回其编号供 add_file_change 使用"""
+        commit_id = self._next_commit_id
+        self._next_commit_id += 1
+        author_id = self._intern('authors', 'name', self._authors, author)
+        self._commit_rows.append((commit_id, self.repo_id, sha, timestamp, author_id, int(is_merge), subject))
+        if len(self._commit_rows) >= self.BATCH_SIZE:
+            self._flush_rows()
+        return commit_id
+
+    def add_file_change(self, commit_id, path, additions, deletions):
+        path_id = self._intern('paths', 'path', self._paths, path)
+        self._change_rows.append((commit_id, path_id, additions, deletions))
+        if len(self._change_rows) >= self.BATCH_SIZE:
+            self._flush_rows()
+
+    def _flush_rows(self):
+        self.conn.executemany('INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?, ?)', self._commit_rows)
+        self.conn.executemany('INSERT INTO file_changes VALUES (?, ?, ?, ?)', self._change_rows)
+        self._commit_rows = []
+        self._change_rows = []
+
+    def commit_repo(self, tips):
+        """写入剩余数据并记录已同步的引用位置"""
+        self._flush_rows()
+        self.conn.execute('UPDATE repos SET tips = ? WHERE id = ?', (json.dumps(tips), self.repo_id))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ---- 查询 ----
+
+    def authors_touching(self, prefix='', since=None, until=None, repo=None):
+        """统计某路径前缀下各作者的提交数与增删行数
+
+        prefix 按路径前缀匹配（走 paths.path 索引的范围查询），
+        since/until 为 Unix 时间戳，repo 为仓库名称。
+        """
+        conditions = ['1 = 1']
+        params = []
+        if prefix:
+            # 前缀范围：[prefix, prefix + U+10FFFF)
+            conditions.append('p.path >= ? AND p.path < ?')
+            params += [prefix, prefix + '\U0010ffff']
+        if since is not None:
+            conditions.append('c.timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('c.timestamp < ?')
+            params.append(until)
+        if repo is not None:
+            conditions.append('r.name = ?')
+            params.append(repo)
+        query = f"""
+            SELECT a.name, COUNT(DISTINCT c.id), SUM(f.additions), SUM(f.deletions), MAX(c.timestamp)
+            FROM paths p
+            JOIN file_changes f ON f.path_id = p.id
+            JOIN commits c ON c.id = f.commit_id
+            JOIN authors a ON a.id = c.author_id
+            JOIN repos r ON r.id = c.repo_id
+            WHERE {' AND '.join(conditions)}
+            GROUP BY a.id
+            ORDER BY COUNT(DISTINCT c.id) DESC
+        """
+        return self.conn.execute(query, params).fetchall()
+
+    def commits_by_author(self, author, since=None, until=None):
+        """按时间倒序列出某作者的提交"""
+        query = """
+            SELECT r.name, c.sha, c.timestamp, c.subject
+            FROM commits c
+            JOIN authors a ON a.id = c.author_id
+            JOIN repos r ON r.id = c.repo_id
+            WHERE a.name = ? AND c.timestamp >= ? AND c.timestamp < ?
+            ORDER BY c.timestamp DESC
+        """
+        return self.conn.execute(query, (author, since or 0, until or 2 ** 62)).fetchall()
+
+
+def parse_date(value):
+    """将 YYYY-MM-DD 解析为本地时间的 Unix 时间戳"""
+    return int(datetime.strptime(value, '%Y-%m-%d').timestamp()) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询统计数据库：某路径下各作者的贡献')
+    parser.add_argument('db_path', help='SQLite 数据库路径')
+    parser.add_argument('prefix', nargs='?', default='', help='路径前缀，如 api/')
+    parser.add_argument('--since', help='起始日期（含），YYYY-MM-DD')
+    parser.add_argument('--until', help='截止日期（不含），YYYY-MM-DD')
+    parser.add_argument('--repo', help='仓库名称')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ 错误: 数据库不存在 - {args.db_path}")
+        sys.exit(1)
+
+    store = StatsStore(args.db_path)
+    rows = store.authors_touching(args.prefix, parse_date(args.since), parse_date(args.until), args.repo)
+    store.close()
+
+    print(f"📂 {args.prefix or '(全部路径)'}")
+    for name, commits, additions, deletions, last in rows:
+        last_date = datetime.fromtimestamp(last).strftime('%Y-%m-%d')
+        print(f"   {name}: {commits} 次提交, +{additions:,} / -{deletions:,}, 最近 {last_date}")
+
+
+if __name__ == '__main__':
+    main()
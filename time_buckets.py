@@ -0,0 +1,183 @@
+"""
+时间分桶聚合 - 按小时/星期/日/月/年统计提交分布
+
+提供两种实现：
+- PythonTimeBuckets: 逐条提交更新计数器（无额外依赖）
+- NumpyTimeBuckets: 先收集时间戳与作者编号，再用 bincount 一次性计算全部直方图
+
+encode_day_counts 将每日提交数编码为紧凑的整数流，供页面绘制提交日历。
+"""
+
+import time
+from array import array
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 1970-01-01 是星期四（weekday() == 3）
+EPOCH_WEEKDAY = 3
+# 时区偏移按 15 分钟时间片查询，夏令时切换都落在时间片边界上
+OFFSET_SLOT_SECONDS = 900
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def encode_day_counts(counts_by_date):
+    """将 {'YYYY-MM-DD': 提交数} 编码为整数流 [间隔, 提交数, 间隔, 提交数, ...]
+
+    日期按自 1970-01-01 起的天数升序排列，间隔为与上一个有提交日期相差的天数
+    （第一项即起始日期本身），连续无提交的日期只体现在间隔中，不占空间。
+    """
+    stream = []
+    previous = 0
+    days = sorted(
+        (date.fromisoformat(key).toordinal() - EPOCH_ORDINAL, count)
+        for key, count in counts_by_date.items() if count
+    )
+    for day, count in days:
+        stream += (day - previous, count)
+        previous = day
+    return stream
+
+
+class PythonTimeBuckets:
+    """逐条提交更新 stats 中的时间计数器"""
+
+    name = 'python'
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def add(self, timestamp, author):
+        dt = datetime.fromtimestamp(timestamp)
+        date_str = dt.strftime('%Y-%m-%d')
+        hour = dt.hour
+        weekday = dt.weekday()
+
+        author_stats = self.stats['authors'][author]
+        author_stats['commits_by_date'][date_str] += 1
+        author_stats['commits_by_hour'][hour] += 1
+        author_stats['commits_by_weekday'][weekday] += 1
+
+        self.stats['by_hour'][hour] += 1
+        self.stats['by_weekday'][weekday] += 1
+        self.stats['by_month'][dt.strftime('%Y-%m')] += 1
+        self.stats['by_year'][dt.year] += 1
+
+        # 热力图数据：按星期几和小时统计
+        self.stats['by_hour_weekday'][weekday][hour] += 1
+
+        # 每日提交统计
+        self.stats['daily_commits'][date_str] += 1
+
+    def flush(self):
+        pass
+
+
+class NumpyTimeBuckets:
+    """收集紧凑的整数数组，批量向量化计算各时间直方图"""
+
+    name = 'numpy'
+
+    # 缓冲的提交数达到该值时自动聚合一次，保证内存占用有上限
+    FLUSH_THRESHOLD = 1 << 20
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.timestamps = array('q')
+        self.author_ids = array('q')
+        self.authors = []
+        self.author_index = {}
+
+    def add(self, timestamp, author):
+        author_id = self.author_index.get(author)
+        if author_id is None:
+            author_id = self.author_index[author] = len(self.authors)
+            self.authors.append(author)
+        self.timestamps.append(timestamp)
+        self.author_ids.append(author_id)
+        if len(self.timestamps) >= self.FLUSH_THRESHOLD:
+            self.flush()
+
+    @staticmethod
+    def _local_seconds(ts):
+        """将 UTC 时间戳转换为本地时间的秒数（与 datetime.fromtimestamp 一致）"""
+        slots, inverse = np.unique(ts // OFFSET_SLOT_SECONDS, return_inverse=True)
+        offsets = np.fromiter(
+            (time.localtime(int(slot) * OFFSET_SLOT_SECONDS).tm_gmtoff for slot in slots),
+            dtype=np.int64,
+            count=len(slots)
+        )
+        return ts + offsets[inverse.reshape(-1)]
+
+    def flush(self):
+        if not self.timestamps:
+            return
+
+        ts = np.frombuffer(self.timestamps, dtype=np.int64)
+        author_ids = np.frombuffer(self.author_ids, dtype=np.int64)
+        n_authors = len(self.authors)
+
+        local = self._local_seconds(ts)
+        days = local // 86400
+        hours = (local % 86400) // 3600
+        weekdays = (days + EPOCH_WEEKDAY) % 7
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+        # 全局小时/星期/热力图
+        hour_counts = np.bincount(hours, minlength=24)
+        weekday_counts = np.bincount(weekdays, minlength=7)
+        heatmap = np.bincount(weekdays * 24 + hours, minlength=168).reshape(7, 24)
+        for hour in np.flatnonzero(hour_counts):
+            self.stats['by_hour'][int(hour)] += int(hour_counts[hour])
+        for weekday in np.flatnonzero(weekday_counts):
+            self.stats['by_weekday'][int(weekday)] += int(weekday_counts[weekday])
+        for weekday, hour in zip(*np.nonzero(heatmap)):
+            self.stats['by_hour_weekday'][int(weekday)][int(hour)] += int(heatmap[weekday, hour])
+
+        # 月度/年度
+        month_keys, month_counts = np.unique(months, return_counts=True)
+        for month, count in zip(month_keys, month_counts):
+            year, month_index = divmod(int(month), 12)
+            self.stats['by_month'][f'{year + 1970:04d}-{month_index + 1:02d}'] += int(count)
+            self.stats['by_year'][year + 1970] += int(count)
+
+        # 每日提交
+        day_keys, day_counts = np.unique(days, return_counts=True)
+        day_labels = {int(day): str(np.datetime64(int(day), 'D')) for day in day_keys}
+        for day, count in zip(day_keys, day_counts):
+            self.stats['daily_commits'][day_labels[int(day)]] += int(count)
+
+        # 作者维度
+        author_hours = np.bincount(author_ids * 24 + hours, minlength=n_authors * 24).reshape(n_authors, 24)
+        author_weekdays = np.bincount(author_ids * 7 + weekdays, minlength=n_authors * 7).reshape(n_authors, 7)
+        for author_id, hour in zip(*np.nonzero(author_hours)):
+            author_stats = self.stats['authors'][self.authors[author_id]]
+            author_stats['commits_by_hour'][int(hour)] += int(author_hours[author_id, hour])
+        for author_id, weekday in zip(*np.nonzero(author_weekdays)):
+            author_stats = self.stats['authors'][self.authors[author_id]]
+            author_stats['commits_by_weekday'][int(weekday)] += int(author_weekdays[author_id, weekday])
+
+        first_day = int(day_keys[0])
+        span = int(day_keys[-1]) - first_day + 1
+        pair_keys, pair_counts = np.unique(author_ids * span + (days - first_day), return_counts=True)
+        for key, count in zip(pair_keys, pair_counts):
+            author_id, day_offset = divmod(int(key), span)
+            author_stats = self.stats['authors'][self.authors[author_id]]
+            author_stats['commits_by_date'][day_labels[first_day + day_offset]] += int(count)
+
+        self.timestamps = array('q')
+        self.author_ids = array('q')
+
+
+def create_time_buckets(stats, backend='auto'):
+    """按配置创建时间分桶实现，NumPy 不可用时回退到纯 Python"""
+    if backend == 'python':
+        return PythonTimeBuckets(stats)
+    if np is None:
+        if backend == 'numpy':
+            print("⚠️  未安装 NumPy，回退到纯 Python 聚合")
+        return PythonTimeBuckets(stats)
+    return NumpyTimeBuckets(stats)
@@ -0,0 +1,78 @@
+"""
+时间线分片 - 将完整提交时间线按月写成紧凑的 JSON 分片
+
+页面只内联一个很小的入口，由浏览器按需加载分片并只渲染可见窗口，
+首屏体积与解析时间不随历史长度增长。
+
+目录结构（位于报告目录下的 timeline/）:
+- manifest.json: 作者表、作者颜色、搜索索引文件名与分片列表（按月份倒序，含每片提交数）
+- search-index.json: 时间线搜索索引（见 search_index.py）
+- YYYY-MM.json: 该月提交（最新优先），列式存储；内容未变化的文件不重写，
+  旧月份分片保持不变，预压缩文件也随之复用
+    t: 时间戳（已按生成报告时的本地时区偏移，前端用 UTC 方法读取即为本地时间）
+    a: 作者编号（对应 manifest 中的作者表）
+    m: 合并标记（0 普通，1 合并，2 类合并）
+    s: 提交信息
+"""
+
+import os
+import time
+import shutil
+import calendar
+
+from stats_cache import save_json
+
+SHARD_DIR = 'timeline'
+MANIFEST_NAME = 'manifest.json'
+SEARCH_INDEX_NAME = 'search-index.json'
+SUBJECT_MAX_LENGTH = 120
+
+
+def write_timeline_shards(timeline, output_dir, author_color, search_index):
+    """写出全部分片、搜索索引与清单，返回清单相对报告目录的路径"""
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    shards = []
+    current_month = None
+    shard = None
+
+    def flush():
+        if shard and shard['t']:
+            name = f'{current_month}.json'
+            save_json(os.path.join(shard_dir, name), shard, skip_unchanged=True)
+            shards.append({'month': current_month, 'file': name, 'count': len(shard['t'])})
+
+    for index in timeline.sorted_indices(reverse=True):
+        local = time.localtime(timeline.timestamps[index])
+        month = time.strftime('%Y-%m', local)
+        if month != current_month:
+            flush()
+            current_month = month
+            shard = {'t': [], 'a': [], 'm': [], 's': []}
+        shard['t'].append(calendar.timegm(local))
+        shard['a'].append(timeline.author_ids[index])
+        shard['m'].append(1 if timeline.is_merge(index) else (2 if timeline.is_merge_like(index) else 0))
+        shard['s'].append(timeline.subject(index)[:SUBJECT_MAX_LENGTH])
+    flush()
+
+    save_json(os.path.join(shard_dir, SEARCH_INDEX_NAME), search_index, skip_unchanged=True)
+    save_json(os.path.join(shard_dir, MANIFEST_NAME), {
+        'total': len(timeline),
+        'authors': timeline.authors,
+        'colors': [author_color(author) for author in timeline.authors],
+        'index': SEARCH_INDEX_NAME,
+        'shards': shards,
+    }, skip_unchanged=True)
+
+    # 清除上次生成、本次已不存在的月份分片（连同其压缩文件）
+    current = {shard['file'] for shard in shards} | {SEARCH_INDEX_NAME, MANIFEST_NAME}
+    for name in os.listdir(shard_dir):
+        if name.endswith(('.json', '.json.gz', '.json.br')) and name[:name.rindex('.json') + 5] not in current:
+            os.remove(os.path.join(shard_dir, name))
+    return f'{SHARD_DIR}/{MANIFEST_NAME}'
+
+
+def remove_timeline_shards(output_dir):
+    """关闭分片模式时删除上次生成的分片目录，避免过期文件被列入产物并发布"""
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    if os.path.isdir(shard_dir):
+        shutil.rmtree(shard_dir)